@@ -1,52 +1,186 @@
-from typing import Any, List
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response, WebSocket, WebSocketDisconnect
+from fastapi.websockets import WebSocketState
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_current_admin_user
-from app.db.session import get_db
-from app.models.user import User
+from app.core.security import authenticate_token, get_current_admin_user, get_hashing_status
+from app.db.session import CommitBeforeResponseRoute, get_db, get_pool_status, run_after_commit
+from app.db.query_stats import route_query_summary
+from app.core.catalog_cache import catalog_cache, catalog_responses
+from app.core.principal_cache import Principal, principal_cache
+from app.core.token_versions import token_versions
+from app.models.crypto import TransactionStatus
+from app.models.withdrawal import WithdrawalStatus
 from app.schemas.user import User as UserSchema, AdminUserCreate, UserUpdate
 from app.schemas.crypto import (
     Crypto, CryptoCreate, CryptoUpdate, 
-    CryptoTransaction, AdminCryptoTransactionUpdate
+    CryptoTransaction, CryptoTransactionListItem, AdminCryptoTransactionUpdate
 )
 from app.schemas.gift_card import (
     GiftCard, GiftCardCreate, GiftCardUpdate, 
-    GiftCardTransaction, AdminGiftCardTransactionUpdate
+    GiftCardTransaction, GiftCardTransactionListItem, AdminGiftCardTransactionUpdate
+)
+from app.schemas.withdrawal import Withdrawal, WithdrawalListItem, AdminWithdrawalUpdate
+from app.schemas.chat import (
+    ChatMessage, ChatMessageCreate, ChatConversation, AdminChatMessageCreate, UserPresence
 )
-from app.schemas.withdrawal import Withdrawal, AdminWithdrawalUpdate
-from app.schemas.chat import ChatMessage, AdminChatMessageCreate
 from app.crud.crud_user import user as crud_user
 from app.crud.crud_crypto import crypto as crud_crypto, crypto_transaction as crud_crypto_transaction
 from app.crud.crud_gift_card import gift_card as crud_gift_card, gift_card_transaction as crud_gift_card_transaction
 from app.crud.crud_withdrawal import withdrawal as crud_withdrawal
 from app.crud.crud_chat import chat_message as crud_chat_message
-from app.utils.websocket_manager import WebSocketManager
+from app.utils.admin_feed import admin_feed
+from app.utils.presence import presence
+from app.utils.websocket_manager import ws_manager
+from app.utils.invalidation_bus import invalidation_bus
+from app.utils.field_projection import field_selection, projected_response
+from app.utils.pagination import Cursor, get_cursor, set_next_cursor
+
+router = APIRouter(route_class=CommitBeforeResponseRoute)
+
+
+# Admin Monitoring
+@router.get("/db/pool", response_model=dict)
+async def get_db_pool_status(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Get live database connection pool usage and checkout wait times
+    """
+    return get_pool_status()
+
+
+@router.get("/db/queries", response_model=List[dict])
+async def get_db_query_summary(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Get per-route SQL statement counts and DB time over the recent window
+    """
+    return route_query_summary.snapshot()
+
+
+@router.get("/cache/principals", response_model=dict)
+async def get_principal_cache_stats(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Get authenticated-principal cache size and hit rate
+    """
+    return principal_cache.stats()
+
+
+@router.get("/cache/catalog", response_model=dict)
+async def get_catalog_cache_stats(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Get crypto/gift card catalog snapshot and response cache hit counts
+    """
+    return {**catalog_cache.stats(), "responses": catalog_responses.stats()}
+
+
+@router.get("/cache/token-versions", response_model=dict)
+async def get_token_version_cache_stats(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Get token-version cache size and hit rate
+    """
+    return token_versions.stats()
+
+
+@router.get("/cache/invalidation", response_model=dict)
+async def get_invalidation_bus_stats(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Get cross-worker cache invalidation event counts
+    """
+    return invalidation_bus.stats()
+
 
-router = APIRouter()
-ws_manager = WebSocketManager()
+@router.get("/password-hashing", response_model=dict)
+async def get_password_hashing_status(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Get bcrypt thread pool size and queue depth
+    """
+    return get_hashing_status()
+
+
+@router.get("/websockets", response_model=dict)
+async def get_websocket_stats(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Get this worker's WebSocket connections, queued messages, evictions and presence heartbeat
+    """
+    return {**ws_manager.stats(), "presence": presence.stats(), "feed": admin_feed.stats()}
+
+
+@router.websocket("/feed")
+async def admin_operations_feed(
+    websocket: WebSocket,
+    token: str,
+    cursor: Optional[str] = None
+):
+    """
+    Live feed of transaction and withdrawal changes for admin dashboards
+
+    Sends {"type": "ops", "cursor", "events"} frames, batched every
+    ADMIN_FEED_BATCH_MS with one event per changed record. Reconnect with
+    the last cursor received to get only what was missed; a
+    {"type": "reset"} frame means the cursor is too old and lists should
+    be reloaded. Admin chat notifications arrive on this socket too.
+    """
+    principal = await authenticate_token(token)
+    if principal is None or not principal.is_active or not principal.is_admin:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    user_id = str(principal.id)
+    await websocket.accept()
+    connection = await admin_feed.connect(user_id, websocket, cursor)
+    try:
+        # Stop once the manager has closed the socket (see the chat endpoint)
+        while websocket.application_state == WebSocketState.CONNECTED:
+            await websocket.receive_text()
+            connection.touch()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await ws_manager.remove_connection(user_id, websocket)
 
 
 # Admin User Management
 @router.get("/users", response_model=List[UserSchema])
 async def get_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(UserSchema)),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Get list of all users
     """
-    return await crud_user.get_multi(db, skip=skip, limit=limit)
+    users = await crud_user.get_multi(db, skip=skip, limit=limit, fields=fields)
+    if fields:
+        return projected_response(response, users, UserSchema, fields)
+    return users
 
 
 @router.post("/users", response_model=UserSchema)
 async def create_admin_user(
     user_in: AdminUserCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Create a new admin user
@@ -67,7 +201,7 @@ async def create_admin_user(
 async def get_user(
     user_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Get a specific user by ID
@@ -86,7 +220,7 @@ async def update_user(
     user_id: str,
     user_in: UserUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Update a user
@@ -106,7 +240,7 @@ async def update_user(
 async def create_crypto(
     crypto_in: CryptoCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Create a new cryptocurrency
@@ -119,7 +253,7 @@ async def update_crypto(
     crypto_id: str,
     crypto_in: CryptoUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Update a cryptocurrency
@@ -134,17 +268,28 @@ async def update_crypto(
     return await crud_crypto.update(db, db_obj=crypto, obj_in=crypto_in)
 
 
-@router.get("/crypto/transactions", response_model=List[CryptoTransaction])
+@router.get("/crypto/transactions", response_model=List[CryptoTransactionListItem])
 async def get_all_crypto_transactions(
+    response: Response,
+    status_filter: Optional[TransactionStatus] = Query(None, alias="status"),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(CryptoTransactionListItem)),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Get all crypto transactions
     """
-    return await crud_crypto_transaction.get_multi(db, skip=skip, limit=limit)
+    items = await crud_crypto_transaction.get_multi(
+        db, status=status_filter, skip=skip, limit=limit, cursor=cursor,
+        fields=fields
+    )
+    set_next_cursor(response, items, limit)
+    if fields:
+        return projected_response(response, items, CryptoTransactionListItem, fields)
+    return items
 
 
 @router.put("/crypto/transactions/{transaction_id}", response_model=CryptoTransaction)
@@ -152,7 +297,7 @@ async def admin_update_crypto_transaction(
     transaction_id: str,
     transaction_in: AdminCryptoTransactionUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Admin update for a crypto transaction
@@ -174,7 +319,7 @@ async def admin_update_crypto_transaction(
 async def create_gift_card(
     gift_card_in: GiftCardCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Create a new gift card
@@ -187,7 +332,7 @@ async def update_gift_card(
     gift_card_id: str,
     gift_card_in: GiftCardUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Update a gift card
@@ -202,17 +347,28 @@ async def update_gift_card(
     return await crud_gift_card.update(db, db_obj=gift_card, obj_in=gift_card_in)
 
 
-@router.get("/gift-cards/transactions", response_model=List[GiftCardTransaction])
+@router.get("/gift-cards/transactions", response_model=List[GiftCardTransactionListItem])
 async def get_all_gift_card_transactions(
+    response: Response,
+    status_filter: Optional[TransactionStatus] = Query(None, alias="status"),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(GiftCardTransactionListItem)),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Get all gift card transactions
     """
-    return await crud_gift_card_transaction.get_multi(db, skip=skip, limit=limit)
+    items = await crud_gift_card_transaction.get_multi(
+        db, status=status_filter, skip=skip, limit=limit, cursor=cursor,
+        fields=fields
+    )
+    set_next_cursor(response, items, limit)
+    if fields:
+        return projected_response(response, items, GiftCardTransactionListItem, fields)
+    return items
 
 
 @router.put("/gift-cards/transactions/{transaction_id}", response_model=GiftCardTransaction)
@@ -220,7 +376,7 @@ async def admin_update_gift_card_transaction(
     transaction_id: str,
     transaction_in: AdminGiftCardTransactionUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Admin update for a gift card transaction
@@ -238,17 +394,28 @@ async def admin_update_gift_card_transaction(
 
 
 # Admin Withdrawal Management
-@router.get("/withdrawals", response_model=List[Withdrawal])
+@router.get("/withdrawals", response_model=List[WithdrawalListItem])
 async def get_all_withdrawals(
+    response: Response,
+    status_filter: Optional[WithdrawalStatus] = Query(None, alias="status"),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(WithdrawalListItem)),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Get all withdrawal requests
     """
-    return await crud_withdrawal.get_multi(db, skip=skip, limit=limit)
+    items = await crud_withdrawal.get_multi(
+        db, status=status_filter, skip=skip, limit=limit, cursor=cursor,
+        fields=fields
+    )
+    set_next_cursor(response, items, limit)
+    if fields:
+        return projected_response(response, items, WithdrawalListItem, fields)
+    return items
 
 
 @router.put("/withdrawals/{withdrawal_id}", response_model=Withdrawal)
@@ -256,7 +423,7 @@ async def admin_update_withdrawal(
     withdrawal_id: str,
     withdrawal_in: AdminWithdrawalUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Admin update for a withdrawal request
@@ -274,24 +441,65 @@ async def admin_update_withdrawal(
 
 
 # Admin Chat Support
-@router.get("/chat/users", response_model=List[dict])
+@router.get("/chat/users", response_model=List[ChatConversation])
 async def get_users_with_unread_messages(
+    response: Response,
+    limit: int = 50,
+    unread_only: bool = False,
+    cursor: Optional[Cursor] = Depends(get_cursor),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Get users with unread messages and message counts
+    Get the chat inbox: users ordered by latest message, with unread counts
     """
-    return await crud_chat_message.get_unread_counts(db, admin=True)
+    conversations = await crud_chat_message.get_conversations(
+        db, limit=limit, cursor=cursor, unread_only=unread_only
+    )
+    set_next_cursor(
+        response, conversations, limit,
+        key=lambda row: (row.last_message_at, row.user_id)
+    )
+    return conversations
+
+
+@router.get("/chat/presence", response_model=List[UserPresence])
+async def get_chat_presence(
+    user_ids: Optional[List[UUID]] = Query(None, alias="user_id"),
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Get who is connected to chat on any worker
+
+    With user_id filters, returns those users (online or not, with last
+    seen when known); otherwise every online user.
+    """
+    online = await presence.online()
+    if user_ids is None:
+        wanted = list(online)
+    else:
+        wanted = [str(user_id) for user_id in user_ids]
+    last_seen = await presence.last_seen(u for u in wanted if u not in online)
+    result = []
+    for user_id in wanted:
+        seen = online.get(user_id, last_seen.get(user_id))
+        result.append(UserPresence(
+            user_id=user_id,
+            online=user_id in online,
+            last_seen=datetime.utcfromtimestamp(seen) if seen is not None else None,
+        ))
+    return result
 
 
 @router.get("/chat/messages/{user_id}", response_model=List[ChatMessage])
 async def get_user_chat_messages(
+    response: Response,
     user_id: str,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[Cursor] = Depends(get_cursor),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Get chat messages for a specific user
@@ -303,16 +511,18 @@ async def get_user_chat_messages(
             detail="User not found"
         )
         
-    return await crud_chat_message.get_messages(
-        db, user_id=user_id, skip=skip, limit=limit
+    items = await crud_chat_message.get_messages(
+        db, user_id=user_id, skip=skip, limit=limit, cursor=cursor
     )
+    set_next_cursor(response, items, limit)
+    return items
 
 
 @router.post("/chat/messages", response_model=ChatMessage)
 async def admin_send_message(
     message_in: AdminChatMessageCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
     Admin sends a message to a user
@@ -334,15 +544,15 @@ async def admin_send_message(
         admin_id=current_user.id
     )
     
-    # Send message to user if they are connected via websocket
-    await ws_manager.send_to_user(
-        str(message_in.user_id),
-        {
-            "admin_id": str(current_user.id),
-            "message": message.message,
-            "created_at": message.created_at.isoformat(),
-            "message_id": str(message.id)
-        }
+    # Deliver to the user's socket on whichever worker holds it, once committed
+    notification = {
+        "admin_id": str(current_user.id),
+        "message": message.message,
+        "created_at": message.created_at.isoformat(),
+        "message_id": str(message.id)
+    }
+    run_after_commit(
+        db, lambda: ws_manager.send_to_user(str(message_in.user_id), notification)
     )
     
     return message
@@ -350,12 +560,30 @@ async def admin_send_message(
 
 @router.post("/chat/messages/mark-as-read", response_model=dict)
 async def admin_mark_messages_as_read(
-    message_ids: List[str],
+    message_ids: List[UUID],
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Admin marks messages as read
+    Admin marks user messages as read
     """
-    count = await crud_chat_message.mark_as_read(db, message_ids=message_ids)
+    count = await crud_chat_message.mark_as_read(
+        db, message_ids=message_ids, from_admin=False
+    )
+    return {"marked_count": count}
+
+
+@router.post("/chat/messages/{user_id}/mark-all-as-read", response_model=dict)
+async def admin_mark_all_messages_as_read(
+    user_id: UUID,
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Admin marks a user's messages up to the cursor (or all of them) as read
+    """
+    count = await crud_chat_message.mark_as_read_up_to(
+        db, user_id=user_id, from_admin=False, cursor=cursor
+    )
     return {"marked_count": count}
\ No newline at end of file
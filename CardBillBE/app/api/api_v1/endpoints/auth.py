@@ -6,14 +6,14 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import create_access_token
-from app.db.session import get_db
+from app.core.security import create_access_token, principal_claims
+from app.db.session import CommitBeforeResponseRoute, get_db
 from app.schemas.auth import Token, LoginRequest, LoginResponse
 from app.schemas.user import UserCreate, User, UserVerify, UserPasswordResetRequest, UserPasswordReset
 from app.crud.crud_user import user as crud_user
 from app.utils.email import send_verification_email, send_password_reset_email
 
-router = APIRouter()
+router = APIRouter(route_class=CommitBeforeResponseRoute)
 
 
 @router.post("/register", response_model=User)
@@ -64,7 +64,8 @@ async def login(
         
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=str(user.id), expires_delta=access_token_expires
+        subject=str(user.id), expires_delta=access_token_expires,
+        claims=principal_claims(user)
     )
     print(f"access token: {access_token}")
     
@@ -102,7 +103,8 @@ async def login_access_token(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": create_access_token(
-            subject=str(user.id), expires_delta=access_token_expires
+            subject=str(user.id), expires_delta=access_token_expires,
+            claims=principal_claims(user)
         ),
         "token_type": "bearer"
     }
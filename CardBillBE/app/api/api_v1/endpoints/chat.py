@@ -1,39 +1,46 @@
-from typing import Any, List
+from typing import Any, List, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, status, Response, WebSocket, WebSocketDisconnect
+from fastapi.websockets import WebSocketState
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_current_active_user
-from app.db.session import get_db
-from app.models.user import User
+from app.core.security import authenticate_token, get_current_active_user
+from app.db.session import CommitBeforeResponseRoute, get_db, run_after_commit
+from app.core.principal_cache import Principal
 from app.schemas.chat import ChatMessage, ChatMessageCreate, ChatMessageUpdate
 from app.crud.crud_chat import chat_message as crud_chat_message
-from app.utils.websocket_manager import WebSocketManager
+from app.utils.websocket_manager import PING_MESSAGE, PONG_MESSAGE, ws_manager
+from app.utils.presence import presence
+from app.utils.pagination import Cursor, get_cursor, set_next_cursor
 
-router = APIRouter()
-ws_manager = WebSocketManager()
+router = APIRouter(route_class=CommitBeforeResponseRoute)
 
 
 @router.get("/messages", response_model=List[ChatMessage])
 async def get_chat_messages(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[Cursor] = Depends(get_cursor),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get user's chat messages
     """
-    return await crud_chat_message.get_messages(
-        db, user_id=current_user.id, skip=skip, limit=limit
+    items = await crud_chat_message.get_messages(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor
     )
+    set_next_cursor(response, items, limit)
+    return items
 
 
 @router.post("/messages", response_model=ChatMessage)
 async def create_chat_message(
     message_in: ChatMessageCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Create a new chat message
@@ -42,52 +49,86 @@ async def create_chat_message(
         db, obj_in=message_in, user_id=current_user.id
     )
     
-    # Notify any connected admin about the new message
-    ws_manager.broadcast_to_admins({
+    # Notify connected admins, on any worker, once the message is committed
+    notification = {
         "user_id": str(current_user.id),
         "message": message.message,
         "created_at": message.created_at.isoformat(),
         "message_id": str(message.id)
-    })
+    }
+    run_after_commit(db, lambda: ws_manager.broadcast_to_admins(notification))
     
     return message
 
 
 @router.post("/messages/mark-as-read", response_model=dict)
 async def mark_messages_as_read(
-    message_ids: List[str],
+    message_ids: List[UUID],
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
-    Mark messages as read
+    Mark admin messages in the user's conversation as read
     """
-    count = await crud_chat_message.mark_as_read(db, message_ids=message_ids)
+    count = await crud_chat_message.mark_as_read(
+        db, message_ids=message_ids, user_id=current_user.id, from_admin=True
+    )
+    return {"marked_count": count}
+
+
+@router.post("/messages/mark-all-as-read", response_model=dict)
+async def mark_all_messages_as_read(
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+) -> Any:
+    """
+    Mark admin messages up to the cursor (or all of them) as read
+    """
+    count = await crud_chat_message.mark_as_read_up_to(
+        db, user_id=current_user.id, from_admin=True, cursor=cursor
+    )
     return {"marked_count": count}
 
 
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket, 
-    user_id: str, 
-    token: str
+    token: str,
+    user_id: Optional[str] = None
 ):
     """
     WebSocket connection for real-time chat
+
+    The access token is verified once, before the handshake completes.
+    The server pings every WS_PING_INTERVAL seconds; any frame from the
+    client (e.g. {"type": "pong"}) keeps the connection alive.
     """
-    # Authenticate using token
-    # In a real implementation, validate token and get user
-    # For this example, we'll just use the provided user_id
-    
+    principal = await authenticate_token(token)
+    if (
+        principal is None
+        or not principal.is_active
+        or (user_id is not None and user_id != str(principal.id))
+    ):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    user_id = str(principal.id)
     await websocket.accept()
-    ws_manager.add_connection(user_id, websocket)
+    connection = await ws_manager.add_connection(user_id, websocket, is_admin=principal.is_admin)
     
     try:
-        while True:
+        # An eviction or reap closes the socket under us; a frame the client
+        # sent before seeing the close must not reach receive_text(), which
+        # raises RuntimeError once the socket is closed
+        while websocket.application_state == WebSocketState.CONNECTED:
             data = await websocket.receive_text()
-            # Process received messages if needed
-            
-            # Echo message back (for testing)
-            await websocket.send_text(f"You sent: {data}")
+            connection.touch()
+            presence.touch(user_id)
+            if data == "ping" or data == PING_MESSAGE:
+                connection.send(PONG_MESSAGE)
     except WebSocketDisconnect:
-        ws_manager.remove_connection(user_id)
\ No newline at end of file
+        pass
+    finally:
+        # Also reached when the socket was closed under us (evicted or reaped)
+        await ws_manager.remove_connection(user_id, websocket)
@@ -1,77 +1,103 @@
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_active_user
-from app.db.session import get_db
-from app.models.user import User
+from app.db.session import CommitBeforeResponseRoute, get_db
+from app.core.catalog_cache import catalog_responses
+from app.core.principal_cache import Principal
 from app.schemas.crypto import (
-    Crypto, CryptoTransaction, CryptoTransactionCreate, CryptoTransactionUpdate
+    Crypto, CryptoTransaction, CryptoTransactionCreate, CryptoTransactionUpdate,
+    CryptoTransactionListItem
 )
 from app.crud.crud_crypto import crypto as crud_crypto, crypto_transaction as crud_crypto_transaction
+from app.utils.etag import conditional_get
+from app.utils.field_projection import field_selection, projected_response
+from app.utils.pagination import Cursor, get_cursor, set_next_cursor
 
-router = APIRouter()
+router = APIRouter(route_class=CommitBeforeResponseRoute)
 
 
 @router.get("/", response_model=List[Crypto])
+@catalog_responses.cached("skip", "limit", "active_only")
 async def get_cryptos(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     active_only: bool = True,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get list of available cryptocurrencies
     """
+    stamp = await crud_crypto.get_catalog_stamp(db)
+    not_modified = conditional_get(request, response, "cryptos", stamp, skip, limit, active_only)
+    if not_modified:
+        return not_modified
     return await crud_crypto.get_multi(db, skip=skip, limit=limit, active_only=active_only)
 
 
 @router.get("/{crypto_id}", response_model=Crypto)
+@catalog_responses.cached("crypto_id")
 async def get_crypto(
     crypto_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get a specific cryptocurrency by ID
     """
-    crypto = await crud_crypto.get(db, id=crypto_id)
+    crypto = await crud_crypto.get_cached(db, id=crypto_id)
     if not crypto:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cryptocurrency not found"
         )
+    not_modified = conditional_get(request, response, "crypto", crypto.id, crypto.updated_at)
+    if not_modified:
+        return not_modified
     return crypto
 
 
-@router.get("/transactions/", response_model=List[CryptoTransaction])
+@router.get("/transactions/", response_model=List[CryptoTransactionListItem])
 async def get_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(CryptoTransactionListItem)),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get list of user's crypto transactions
     """
-    return await crud_crypto_transaction.get_multi(
-        db, user_id=current_user.id, skip=skip, limit=limit
+    items = await crud_crypto_transaction.get_multi(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor,
+        fields=fields
     )
+    set_next_cursor(response, items, limit)
+    if fields:
+        return projected_response(response, items, CryptoTransactionListItem, fields)
+    return items
 
 
 @router.post("/transactions/", response_model=CryptoTransaction)
 async def create_transaction(
     transaction_in: CryptoTransactionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Create a new crypto transaction
     """
     return await crud_crypto_transaction.create(
-        db, obj_in=transaction_in, user=current_user
+        db, obj_in=transaction_in, user_id=current_user.id
     )
 
 
@@ -79,7 +105,7 @@ async def create_transaction(
 async def get_transaction(
     transaction_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get a specific transaction by ID
@@ -98,7 +124,7 @@ async def update_transaction(
     transaction_id: str,
     transaction_in: CryptoTransactionUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Update a transaction (limited fields)
@@ -1,81 +1,115 @@
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_active_user
-from app.db.session import get_db
-from app.models.user import User
+from app.db.session import CommitBeforeResponseRoute, get_db
+from app.core.catalog_cache import catalog_responses
+from app.core.principal_cache import Principal
+from app.models.gift_card import GiftCardType
 from app.schemas.gift_card import (
-    GiftCard, GiftCardTransaction, GiftCardTransactionCreate, GiftCardTransactionUpdate
+    GiftCard, GiftCardTransaction, GiftCardTransactionCreate, GiftCardTransactionUpdate,
+    GiftCardTransactionListItem
 )
 from app.crud.crud_gift_card import (
     gift_card as crud_gift_card, 
     gift_card_transaction as crud_gift_card_transaction
 )
 from app.utils.file_upload import save_gift_card_image
+from app.utils.etag import conditional_get
+from app.utils.field_projection import field_selection, projected_response
+from app.utils.pagination import Cursor, get_cursor, set_next_cursor
 
-router = APIRouter()
+router = APIRouter(route_class=CommitBeforeResponseRoute)
 
 
 @router.get("/", response_model=List[GiftCard])
+@catalog_responses.cached("skip", "limit", "active_only", "card_type")
 async def get_gift_cards(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     active_only: bool = True,
+    card_type: Optional[GiftCardType] = Query(None, alias="type"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
-    Get list of available gift cards
+    Get list of available gift cards, optionally of one type
     """
-    return await crud_gift_card.get_multi(db, skip=skip, limit=limit, active_only=active_only)
+    stamp = await crud_gift_card.get_catalog_stamp(db)
+    not_modified = conditional_get(
+        request, response, "gift_cards", stamp, skip, limit, active_only, card_type
+    )
+    if not_modified:
+        return not_modified
+    return await crud_gift_card.get_multi(
+        db, skip=skip, limit=limit, active_only=active_only, type=card_type
+    )
 
 
 @router.get("/{gift_card_id}", response_model=GiftCard)
+@catalog_responses.cached("gift_card_id")
 async def get_gift_card(
     gift_card_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get a specific gift card by ID
     """
-    gift_card = await crud_gift_card.get(db, id=gift_card_id)
+    gift_card = await crud_gift_card.get_cached(db, id=gift_card_id)
     if not gift_card:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gift card not found"
         )
+    not_modified = conditional_get(
+        request, response, "gift_card", gift_card.id, gift_card.updated_at
+    )
+    if not_modified:
+        return not_modified
     return gift_card
 
 
-@router.get("/transactions/", response_model=List[GiftCardTransaction])
+@router.get("/transactions/", response_model=List[GiftCardTransactionListItem])
 async def get_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(GiftCardTransactionListItem)),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get list of user's gift card transactions
     """
-    return await crud_gift_card_transaction.get_multi(
-        db, user_id=current_user.id, skip=skip, limit=limit
+    items = await crud_gift_card_transaction.get_multi(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor,
+        fields=fields
     )
+    set_next_cursor(response, items, limit)
+    if fields:
+        return projected_response(response, items, GiftCardTransactionListItem, fields)
+    return items
 
 
 @router.post("/transactions/", response_model=GiftCardTransaction)
 async def create_transaction(
     transaction_in: GiftCardTransactionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Create a new gift card transaction
     """
     # Validate gift card exists
-    gift_card = await crud_gift_card.get(db, id=transaction_in.gift_card_id)
+    gift_card = await crud_gift_card.get_cached(db, id=transaction_in.gift_card_id)
     if not gift_card:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -83,14 +117,14 @@ async def create_transaction(
         )
         
     return await crud_gift_card_transaction.create(
-        db, obj_in=transaction_in, user=current_user
+        db, obj_in=transaction_in, user_id=current_user.id
     )
 
 
 @router.post("/transactions/upload-card-image", response_model=dict)
 async def upload_gift_card_image(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Upload gift card image and get URL to include in transaction creation
@@ -105,7 +139,7 @@ async def upload_gift_card_image(
 async def get_transaction(
     transaction_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get a specific gift card transaction by ID
@@ -124,7 +158,7 @@ async def update_transaction(
     transaction_id: str,
     transaction_in: GiftCardTransactionUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Update a gift card transaction (limited fields)
@@ -1,26 +1,50 @@
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_active_user
-from app.db.session import get_db
-from app.models.user import User
+from app.db.session import CommitBeforeResponseRoute, get_db
+from app.core.principal_cache import Principal
 from app.schemas.user import User as UserSchema, UserUpdate, UserCreate
 from app.crud.crud_user import user as crud_user
+from app.utils.etag import conditional_get
 from app.utils.file_upload import save_profile_picture
 
-router = APIRouter()
+router = APIRouter(route_class=CommitBeforeResponseRoute)
+
+
+async def _get_own_user(db: AsyncSession, current_user: Principal):
+    """
+    Load the full user row behind the authenticated principal
+    """
+    user = await crud_user.get(db, id=current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
 
 
 @router.get("/me", response_model=UserSchema)
 async def read_user_me(
-    current_user: User = Depends(get_current_active_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get current user
     """
-    return current_user
+    user = await _get_own_user(db, current_user)
+    # Balance is what clients poll this route for, so key on it explicitly
+    not_modified = conditional_get(
+        request, response, "user", user.id, user.updated_at, user.balance
+    )
+    if not_modified:
+        return not_modified
+    return user
 
 
 
@@ -28,7 +52,7 @@ async def read_user_me(
 async def update_user_me(
     user_in: UserUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Update own user data
@@ -37,14 +61,15 @@ async def update_user_me(
     if user_in.is_admin is not None:
         user_in.is_admin = current_user.is_admin
         
-    return await crud_user.update(db, db_obj=current_user, obj_in=user_in)
+    user = await _get_own_user(db, current_user)
+    return await crud_user.update(db, db_obj=user, obj_in=user_in)
 
 
 @router.post("/me/profile-picture", response_model=UserSchema)
 async def upload_profile_picture(
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Upload profile picture
@@ -53,10 +78,9 @@ async def upload_profile_picture(
     picture_url = await save_profile_picture(file, user_id=current_user.id)
     
     # Update user with profile picture URL
-    current_user = await crud_user.update(
+    user = await _get_own_user(db, current_user)
+    return await crud_user.update(
         db, 
-        db_obj=current_user, 
+        db_obj=user, 
         obj_in={"profile_picture": picture_url}
-    )
-    
-    return current_user
\ No newline at end of file
+    )
\ No newline at end of file
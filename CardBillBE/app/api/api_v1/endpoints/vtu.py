@@ -1,38 +1,48 @@
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_active_user
-from app.db.session import get_db
-from app.models.user import User
-from app.schemas.vtu import VTUTransaction, VTUTransactionCreate
+from app.db.session import CommitBeforeResponseRoute, get_db
+from app.core.principal_cache import Principal
+from app.schemas.vtu import VTUTransaction, VTUTransactionCreate, VTUTransactionListItem
 from app.crud.crud_vtu import vtu_transaction as crud_vtu_transaction
 from app.utils.vtu_provider import process_vtu_transaction
+from app.utils.field_projection import field_selection, projected_response
+from app.utils.pagination import Cursor, get_cursor, set_next_cursor
 
-router = APIRouter()
+router = APIRouter(route_class=CommitBeforeResponseRoute)
 
 
-@router.get("/transactions", response_model=List[VTUTransaction])
+@router.get("/transactions", response_model=List[VTUTransactionListItem])
 async def get_vtu_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(VTUTransactionListItem)),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get list of user's VTU transactions
     """
-    return await crud_vtu_transaction.get_multi(
-        db, user_id=current_user.id, skip=skip, limit=limit
+    items = await crud_vtu_transaction.get_multi(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor,
+        fields=fields
     )
+    set_next_cursor(response, items, limit)
+    if fields:
+        return projected_response(response, items, VTUTransactionListItem, fields)
+    return items
 
 
 @router.post("/transactions", response_model=VTUTransaction)
 async def create_vtu_transaction(
     transaction_in: VTUTransactionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Create a new VTU transaction
@@ -40,16 +50,14 @@ async def create_vtu_transaction(
     try:
         # Create transaction in pending state
         transaction = await crud_vtu_transaction.create(
-            db, obj_in=transaction_in, user=current_user
+            db, obj_in=transaction_in, user_id=current_user.id
         )
         
         # Process transaction with VTU provider
         # This would typically be done asynchronously in a background task
+        # (updates the same session object, so no re-fetch is needed)
         await process_vtu_transaction(db, transaction)
         
-        # Get updated transaction
-        transaction = await crud_vtu_transaction.get(db, id=transaction.id)
-        
         return transaction
     except ValueError as e:
         raise HTTPException(
@@ -62,7 +70,7 @@ async def create_vtu_transaction(
 async def get_vtu_transaction(
     transaction_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get a specific VTU transaction by ID
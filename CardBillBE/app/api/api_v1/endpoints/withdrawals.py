@@ -1,44 +1,54 @@
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_active_user
-from app.db.session import get_db
-from app.models.user import User
-from app.schemas.withdrawal import Withdrawal, WithdrawalCreate, WithdrawalUpdate
+from app.db.session import CommitBeforeResponseRoute, get_db
+from app.core.principal_cache import Principal
+from app.schemas.withdrawal import Withdrawal, WithdrawalCreate, WithdrawalUpdate, WithdrawalListItem
 from app.crud.crud_withdrawal import withdrawal as crud_withdrawal
+from app.utils.field_projection import field_selection, projected_response
+from app.utils.pagination import Cursor, get_cursor, set_next_cursor
 
-router = APIRouter()
+router = APIRouter(route_class=CommitBeforeResponseRoute)
 
 
-@router.get("/", response_model=List[Withdrawal])
+@router.get("/", response_model=List[WithdrawalListItem])
 async def get_withdrawals(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(WithdrawalListItem)),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get list of user's withdrawal requests
     """
-    return await crud_withdrawal.get_multi(
-        db, user_id=current_user.id, skip=skip, limit=limit
+    items = await crud_withdrawal.get_multi(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor,
+        fields=fields
     )
+    set_next_cursor(response, items, limit)
+    if fields:
+        return projected_response(response, items, WithdrawalListItem, fields)
+    return items
 
 
 @router.post("/", response_model=Withdrawal)
 async def create_withdrawal(
     withdrawal_in: WithdrawalCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Create a new withdrawal request
     """
     try:
         return await crud_withdrawal.create(
-            db, obj_in=withdrawal_in, user=current_user
+            db, obj_in=withdrawal_in, user_id=current_user.id
         )
     except ValueError as e:
         raise HTTPException(
@@ -51,7 +61,7 @@ async def create_withdrawal(
 async def get_withdrawal(
     withdrawal_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Get a specific withdrawal by ID
@@ -70,7 +80,7 @@ async def update_withdrawal(
     withdrawal_id: str,
     withdrawal_in: WithdrawalUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     Update a withdrawal request (limited fields)
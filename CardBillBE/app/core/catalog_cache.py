@@ -0,0 +1,138 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.crypto import Crypto
+from app.models.gift_card import GiftCard, GiftCardType
+from app.schemas.crypto import Crypto as CryptoSchema
+from app.schemas.gift_card import GiftCard as GiftCardSchema
+from app.utils.invalidation_bus import invalidation_bus
+from app.utils.response_cache import ResponseCache
+
+
+class CatalogSnapshot:
+    """
+    Immutable view of the crypto and gift card catalog at one version
+
+    Items are shared between requests and must be treated as read-only.
+    """
+    def __init__(
+        self, version: int, cryptos: List[CryptoSchema], gift_cards: List[GiftCardSchema]
+    ):
+        self.version = version
+        self.cryptos: Tuple[CryptoSchema, ...] = tuple(cryptos)
+        self.active_cryptos = tuple(c for c in cryptos if c.is_active)
+        self.gift_cards: Tuple[GiftCardSchema, ...] = tuple(gift_cards)
+        self.active_gift_cards = tuple(g for g in gift_cards if g.is_active)
+        # (max updated_at, row count): changes whenever any row is added or edited,
+        # and agrees across workers, so it can back ETags
+        self.cryptos_stamp = (max((c.updated_at for c in cryptos), default=None), len(cryptos))
+        self.gift_cards_stamp = (
+            max((g.updated_at for g in gift_cards), default=None), len(gift_cards)
+        )
+
+        self.cryptos_by_id: Dict[UUID, CryptoSchema] = {c.id: c for c in cryptos}
+        # Symbols are not unique; an active row wins over inactive ones
+        self.cryptos_by_symbol: Dict[str, CryptoSchema] = {
+            c.symbol: c for c in sorted(cryptos, key=lambda c: c.is_active)
+        }
+        self.gift_cards_by_id: Dict[UUID, GiftCardSchema] = {g.id: g for g in gift_cards}
+        by_type: Dict[GiftCardType, List[GiftCardSchema]] = defaultdict(list)
+        for gift_card in self.active_gift_cards:
+            by_type[gift_card.type].append(gift_card)
+        self.active_gift_cards_by_type: Dict[GiftCardType, Tuple[GiftCardSchema, ...]] = {
+            card_type: tuple(items) for card_type, items in by_type.items()
+        }
+
+
+class CatalogCache:
+    """
+    Process-wide catalog snapshot, reloaded on first use after invalidation
+
+    Catalog writes publish "crypto"/"gift_card" invalidation events once
+    their transaction commits; the TTL is a backstop for lost events.
+    """
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._expires_at = 0.0
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    def _fresh(self) -> Optional[CatalogSnapshot]:
+        if self._snapshot is not None and self._expires_at > time.monotonic():
+            return self._snapshot
+        return None
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        snapshot = self._fresh()
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._fresh()
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot
+
+            version = self._version
+            snapshot = await self._load(db, version)
+            self.loads += 1
+            # Don't install a snapshot that an invalidation overtook mid-load
+            if version == self._version:
+                self._snapshot = snapshot
+                self._expires_at = time.monotonic() + self.ttl
+            return snapshot
+
+    async def invalidate(self):
+        self._version += 1
+        self._snapshot = None
+        self.invalidations += 1
+
+    async def _load(self, db: AsyncSession, version: int) -> CatalogSnapshot:
+        cryptos = await db.execute(select(Crypto).order_by(Crypto.created_at, Crypto.id))
+        gift_cards = await db.execute(select(GiftCard).order_by(GiftCard.created_at, GiftCard.id))
+        return CatalogSnapshot(
+            version,
+            [CryptoSchema.model_validate(c) for c in cryptos.scalars().all()],
+            [GiftCardSchema.model_validate(g) for g in gift_cards.scalars().all()],
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": self._version,
+            "loaded": snapshot is not None,
+            "cryptos": len(snapshot.cryptos) if snapshot else 0,
+            "gift_cards": len(snapshot.gift_cards) if snapshot else 0,
+            "hits": self.hits,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+        }
+
+
+catalog_cache = CatalogCache(ttl=settings.CATALOG_CACHE_TTL)
+
+# Encoded bodies of the catalog read routes
+catalog_responses = ResponseCache(
+    "catalog", entities=("crypto", "gift_card"),
+    maxsize=settings.RESPONSE_CACHE_SIZE, ttl=settings.CATALOG_CACHE_TTL
+)
+
+
+async def _on_catalog_changed(id: Optional[str], version: Optional[int]):
+    await catalog_cache.invalidate()
+
+
+invalidation_bus.subscribe("crypto", _on_catalog_changed)
+invalidation_bus.subscribe("gift_card", _on_catalog_changed)
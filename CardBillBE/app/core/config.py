@@ -1,8 +1,9 @@
 import secrets
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 
-from pydantic import AnyHttpUrl, EmailStr, validator
-from pydantic_settings import BaseSettings
+from pydantic import AnyHttpUrl, EmailStr, Field, ValidationInfo, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -12,7 +13,8 @@ class Settings(BaseSettings):
 
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
-    @validator("BACKEND_CORS_ORIGINS", pre=True)
+    @field_validator("BACKEND_CORS_ORIGINS", mode="before")
+    @classmethod
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
         if isinstance(v, str) and not v.startswith("["):
             return [i.strip() for i in v.split(",")]
@@ -27,14 +29,80 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
-    SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    SQLALCHEMY_DATABASE_URI: Optional[str] = Field(None, validate_default=True)
 
-    @validator("SQLALCHEMY_DATABASE_URI", pre=True)
-    def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
-        if isinstance(v, str):
-            return
+    @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
+    @classmethod
+    def assemble_db_connection(cls, v: Optional[str], info: ValidationInfo) -> Any:
+        if isinstance(v, str) and v:
+            return v
+        values = info.data
         return f"postgresql+asyncpg://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}/{values.get('POSTGRES_DB')}"
 
+    # Connection pool settings (shared by every session in the process)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+
+    # Per-request SQL statistics
+    SQL_STATEMENT_BUDGET: int = 15
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 5
+    SQL_STATS_WINDOW: int = 500
+
+    # Optional Redis shared by all workers (caches, pub/sub); in-process only when unset
+    REDIS_URL: Optional[str] = None
+
+    # Authenticated-principal cache
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60
+
+    # Access-token signing keys by kid (JSON object in the environment). Every
+    # worker must share them; when unset SECRET_KEY is the only key, under JWT_KEY_ID
+    JWT_KEYS: Dict[str, str] = {}
+    # kid that signs new tokens until a scheduled activation takes over
+    JWT_KEY_ID: str = "primary"
+    # kid -> UTC time it starts signing new tokens (JSON object in the environment)
+    JWT_KEY_ACTIVATIONS: Dict[str, datetime] = {}
+
+    # Caches used to validate access tokens without a database round trip
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_VERSION_CACHE_SIZE: int = 50000
+    TOKEN_VERSION_CACHE_TTL: int = 60
+
+    # Crypto/gift card catalog snapshot; backstop for missed invalidation events
+    CATALOG_CACHE_TTL: int = 60
+    # Encoded response bodies kept per cached route family
+    RESPONSE_CACHE_SIZE: int = 1000
+
+    # Response compression (brotli is used when the package is installed)
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 5
+
+    # WebSockets: messages buffered per connection before a slow client is dropped
+    WS_SEND_QUEUE_SIZE: int = 256
+    # Server pings every interval; a socket silent for the timeout is closed
+    WS_PING_INTERVAL: int = 25
+    WS_IDLE_TIMEOUT: int = 75
+
+    # Admin operations feed: events are batched into one frame per interval;
+    # the buffer (Redis stream or in-process) bounds how far back a cursor resumes
+    ADMIN_FEED_BATCH_MS: int = 250
+    ADMIN_FEED_BUFFER_SIZE: int = 10000
+
+    # Presence: each worker refreshes its online users every interval; a
+    # worker that misses PRESENCE_TTL seconds of heartbeats is treated as gone
+    PRESENCE_TTL: int = 60
+    PRESENCE_HEARTBEAT_INTERVAL: int = 20
+    PRESENCE_LAST_SEEN_TTL: int = 60 * 60 * 24 * 30
+
+    # Password hashing (bcrypt runs off the event loop in its own thread pool)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
     # Email configuration
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
@@ -52,9 +120,7 @@ class Settings(BaseSettings):
     # FIRST_ADMIN_USERNAME: str
     # FIRST_ADMIN_PASSWORD: str
 
-    class Config:
-        case_sensitive = True
-        env_file = ".env"
+    model_config = SettingsConfigDict(case_sensitive=True, env_file=".env")
 
 
 settings = Settings()
@@ -0,0 +1,91 @@
+import bisect
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Key id assumed for tokens signed before key ids were added
+LEGACY_KEY_ID = ""
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class KeyRing:
+    """
+    JWT signing keys indexed by key id (kid)
+
+    Every configured key verifies tokens. The key that signs new tokens is
+    the one with the latest activation time that has passed, so a new key
+    can be shipped to all workers ahead of its activation and old keys kept
+    until the tokens they signed have expired.
+    """
+    def __init__(
+        self, keys: Dict[str, str], activations: Dict[str, datetime],
+        default_kid: str, legacy_secret: Optional[str] = None
+    ):
+        if default_kid not in keys:
+            raise ValueError(f"Signing key '{default_kid}' is not in the key ring")
+        unknown = set(activations) - set(keys)
+        if unknown:
+            raise ValueError(f"Activation scheduled for unknown keys: {sorted(unknown)}")
+
+        self._keys = dict(keys)
+        if legacy_secret:
+            self._keys.setdefault(LEGACY_KEY_ID, legacy_secret)
+
+        schedule = sorted(
+            (_as_naive_utc(activates_at), kid) for kid, activates_at in activations.items()
+            if kid != default_kid
+        )
+        self._activation_times: List[datetime] = [at for at, _ in schedule]
+        self._activation_kids: List[str] = [kid for _, kid in schedule]
+        self._default_kid = default_kid
+
+    def signing_key(self, now: Optional[datetime] = None) -> Tuple[str, str]:
+        """
+        (kid, secret) of the key that signs tokens at `now`
+        """
+        now = now or datetime.utcnow()
+        index = bisect.bisect_right(self._activation_times, now)
+        kid = self._activation_kids[index - 1] if index else self._default_kid
+        return kid, self._keys[kid]
+
+    def verification_key(self, kid: Optional[str]) -> Optional[str]:
+        """
+        Secret for a token's kid, or None if the key is not in the ring
+        """
+        return self._keys.get(LEGACY_KEY_ID if kid is None else kid)
+
+    def kids(self) -> List[str]:
+        return [kid for kid in self._keys if kid != LEGACY_KEY_ID]
+
+
+def build_key_ring() -> KeyRing:
+    """
+    Key ring from JWT_KEYS, falling back to SECRET_KEY as a single key
+    """
+    if settings.JWT_KEYS:
+        keys = settings.JWT_KEYS
+    else:
+        if "SECRET_KEY" not in settings.model_fields_set:
+            logger.warning(
+                "Neither JWT_KEYS nor SECRET_KEY is configured; tokens are signed "
+                "with a per-process random key and will not validate on other workers"
+            )
+        keys = {settings.JWT_KEY_ID: settings.SECRET_KEY}
+    return KeyRing(
+        keys,
+        settings.JWT_KEY_ACTIVATIONS,
+        default_kid=settings.JWT_KEY_ID,
+        legacy_secret=settings.SECRET_KEY,
+    )
+
+
+key_ring = build_key_ring()
@@ -0,0 +1,152 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.utils.invalidation_bus import invalidation_bus
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "principal:"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The fields of an authenticated user that authorization needs
+    """
+    id: UUID
+    email: str
+    is_active: bool
+    is_admin: bool
+    is_verified: bool
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_admin=bool(user.is_admin),
+            is_verified=bool(user.is_verified),
+        )
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["id"] = str(self.id)
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Principal":
+        data = json.loads(raw)
+        data["id"] = UUID(data["id"])
+        return cls(**data)
+
+
+class PrincipalCache:
+    """
+    Bounded TTL/LRU cache of principals keyed by user id
+
+    Backed by an in-process LRU and, when REDIS_URL is configured, a shared
+    Redis tier so workers can reuse each other's lookups.
+    """
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[UUID, Tuple[float, Principal]]" = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, user_id: UUID) -> Optional[Principal]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, principal = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.local_hits += 1
+                return principal
+            del self._entries[user_id]
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(f"{REDIS_KEY_PREFIX}{user_id}")
+            except Exception as e:
+                logger.warning(f"Principal cache Redis read failed: {str(e)}")
+                raw = None
+            if raw:
+                principal = Principal.from_json(raw)
+                self._store_local(principal)
+                self.redis_hits += 1
+                return principal
+
+        self.misses += 1
+        return None
+
+    async def set(self, principal: Principal):
+        self._store_local(principal)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.set(f"{REDIS_KEY_PREFIX}{principal.id}", principal.to_json(), ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Principal cache Redis write failed: {str(e)}")
+
+    async def invalidate(self, user_id: UUID):
+        self.evict_local(user_id)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.delete(f"{REDIS_KEY_PREFIX}{user_id}")
+            except Exception as e:
+                logger.warning(f"Principal cache Redis delete failed: {str(e)}")
+
+    def evict_local(self, user_id: UUID):
+        if self._entries.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def clear_local(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def _store_local(self, principal: Principal):
+        self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        hits = self.local_hits + self.redis_hits
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "backend": "redis" if get_redis() is not None else "memory",
+        }
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+
+async def _on_user_changed(id: Optional[str], version: Optional[int]):
+    if id is None:
+        principal_cache.clear_local()
+    else:
+        await principal_cache.invalidate(UUID(id))
+
+
+invalidation_bus.subscribe("user", _on_user_changed)
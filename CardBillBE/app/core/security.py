@@ -1,5 +1,11 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Callable, Dict, Tuple, Union, Optional
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -8,15 +14,31 @@ from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.session import get_db
-from app.models.user import User
+from app.core.key_ring import key_ring
+from app.core.principal_cache import Principal, principal_cache
+from app.core.token_versions import token_versions
+from app.db.session import AsyncSessionLocal, get_db
 from app.crud.crud_user import user as crud_user
+from app.schemas.auth import TokenPayload
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+def principal_claims(user: Any) -> Dict[str, Any]:
+    """
+    Authorization claims embedded in a user's access token
+    """
+    return {
+        "email": user.email,
+        "adm": bool(user.is_admin),
+        "act": bool(user.is_active),
+        "vrf": bool(user.is_verified),
+        "ver": user.token_version or 0,
+    }
+
 def create_access_token(
-    subject: Union[str, Any], expires_delta: Optional[timedelta] = None
+    subject: Union[str, Any], expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None
 ) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -24,49 +46,167 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
+    kid, secret = key_ring.signing_key()
+    encoded_jwt = jwt.encode(
+        to_encode, secret, algorithm="HS256", headers={"kid": kid}
+    )
     return encoded_jwt
 
+# Verified payloads keyed by SHA-256 of the token, so repeat callers skip
+# the HMAC check and JSON parsing. Each entry keeps the kid and secret it was
+# verified with, and is only reused while the key ring still maps that kid
+# to that secret.
+_decoded_tokens: "OrderedDict[bytes, Tuple[TokenPayload, Optional[str], str]]" = OrderedDict()
+
+def decode_access_token(token: str) -> TokenPayload:
+    """
+    Verify and decode an access token
+    Raises JWTError or ValueError if the token is invalid or expired
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    entry = _decoded_tokens.get(digest)
+    if entry is not None:
+        payload, kid, secret = entry
+        if payload.exp > time.time() and key_ring.verification_key(kid) == secret:
+            _decoded_tokens.move_to_end(digest)
+            return payload
+        del _decoded_tokens[digest]
+
+    kid = jwt.get_unverified_header(token).get("kid")
+    secret = key_ring.verification_key(kid)
+    if secret is None:
+        raise JWTError("Unknown signing key")
+    payload = TokenPayload(
+        **jwt.decode(token, secret, algorithms=["HS256"])
+    )
+
+    _decoded_tokens[digest] = (payload, kid, secret)
+    while len(_decoded_tokens) > settings.TOKEN_CACHE_SIZE:
+        _decoded_tokens.popitem(last=False)
+    return payload
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+# bcrypt takes a few hundred ms per call; keep it off the event loop
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
+_hash_pending = 0
+
+async def _run_in_hash_executor(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a bcrypt call in the hashing pool, rejecting with 503 when the queue is full
+    """
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_executor(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_hash_executor(get_password_hash, password)
+
+def get_hashing_status() -> dict:
+    """
+    Current bcrypt pool load
+    """
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "pending": _hash_pending,
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+    }
+
+async def authenticate_token(token: str, db: Optional[AsyncSession] = None) -> Optional[Principal]:
+    """
+    Resolve an access token to a principal, or None if it is not valid
+
+    Tokens carrying principal claims are validated in memory against the
+    user's token version; older tokens fall back to the principal cache.
+    Without `db`, a short-lived session is opened only when the caches
+    miss, so long-lived callers (WebSockets) don't pin a DB connection.
+    """
+    try:
+        payload = decode_access_token(token)
+        user_id = UUID(payload.sub)
+    except (JWTError, ValueError):
+        return None
+
+    if payload.ver is None:
+        principal = await principal_cache.get(user_id)
+        if principal is None:
+            user = await _query(db, lambda session: crud_user.get(session, id=user_id))
+            if user is None:
+                return None
+            principal = Principal.from_user(user)
+            await principal_cache.set(principal)
+        return principal
+
+    version = await token_versions.get(user_id)
+    if version is None:
+        version = await _query(db, lambda session: crud_user.get_token_version(session, id=user_id))
+        if version is None:
+            return None
+        token_versions.store_local(user_id, version)
+    if payload.ver != version:
+        return None
+
+    return Principal(
+        id=user_id,
+        email=payload.email,
+        is_active=payload.act,
+        is_admin=payload.adm,
+        is_verified=payload.vrf,
+    )
+
+
+async def _query(db: Optional[AsyncSession], query: Callable[[AsyncSession], Any]) -> Any:
+    if db is not None:
+        return await query(db)
+    async with AsyncSessionLocal() as session:
+        return await query(session)
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=["HS256"]
+) -> Principal:
+    """
+    Resolve the bearer token to a principal
+    """
+    principal = await authenticate_token(token, db)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = await crud_user.get(db, id=user_id)
-    if user is None:
-        raise credentials_exception
-    return user
+    return principal
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
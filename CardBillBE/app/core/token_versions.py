@@ -0,0 +1,130 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.utils.invalidation_bus import invalidation_bus
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "token_version:"
+
+
+class TokenVersionCache:
+    """
+    Current token version per user, so access-token claims can be checked
+    for revocation without loading the user
+
+    Entries expire after `ttl` seconds, which bounds how long another worker
+    can keep accepting a revoked token when Redis is not configured.
+    """
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[UUID, Tuple[float, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: UUID) -> Optional[int]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, version = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return version
+            del self._entries[user_id]
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(f"{REDIS_KEY_PREFIX}{user_id}")
+            except Exception as e:
+                logger.warning(f"Token version Redis read failed: {str(e)}")
+                raw = None
+            if raw is not None:
+                self.store_local(user_id, int(raw))
+                self.hits += 1
+                return int(raw)
+
+        self.misses += 1
+        return None
+
+    async def set(self, user_id: UUID, version: int):
+        self.store_local(user_id, version)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                # Outlive every token issued before the bump
+                await redis.set(
+                    f"{REDIS_KEY_PREFIX}{user_id}", version,
+                    ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+                )
+            except Exception as e:
+                logger.warning(f"Token version Redis write failed: {str(e)}")
+
+    async def invalidate(self, user_id: UUID):
+        self.evict_local(user_id)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.delete(f"{REDIS_KEY_PREFIX}{user_id}")
+            except Exception as e:
+                logger.warning(f"Token version Redis delete failed: {str(e)}")
+
+    def evict_local(self, user_id: UUID):
+        self._entries.pop(user_id, None)
+
+    def clear_local(self):
+        self._entries.clear()
+
+    def note_version(self, user_id: UUID, version: int):
+        """
+        Record a version bump announced by another worker, ignoring stale events
+        """
+        entry = self._entries.get(user_id)
+        if entry is None or entry[1] < version:
+            self.store_local(user_id, version)
+
+    def store_local(self, user_id: UUID, version: int):
+        """
+        Cache a version read from the database in this process only
+
+        Only bumps are written to Redis; publishing a database read could
+        overwrite a newer version committed concurrently.
+        """
+        self._entries[user_id] = (time.monotonic() + self.ttl, version)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_versions = TokenVersionCache(
+    maxsize=settings.TOKEN_VERSION_CACHE_SIZE, ttl=settings.TOKEN_VERSION_CACHE_TTL
+)
+
+
+async def _on_token_version(id: Optional[str], version: Optional[int]):
+    if id is None:
+        token_versions.clear_local()
+    elif version is None:
+        # User deleted
+        token_versions.evict_local(UUID(id))
+    else:
+        token_versions.note_version(UUID(id), version)
+
+
+invalidation_bus.subscribe("token_version", _on_token_version)
@@ -1,11 +1,18 @@
-from typing import List, Optional
+from collections import Counter
+from typing import Any, List, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Update, any_, bindparam, case, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.chat import ChatMessage
+from app.models.chat import ChatMessage, ChatConversation
+from app.models.user import User
 from app.schemas.chat import ChatMessageCreate, ChatMessageUpdate
+from app.utils.pagination import Cursor, apply_cursor
+
+# Characters of the latest message kept on the conversation summary
+PREVIEW_LENGTH = 200
 
 
 class CRUDChatMessage:
@@ -17,35 +24,44 @@ class CRUDChatMessage:
         return result.scalars().first()
         
     async def get_messages(
-        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100
+        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100,
+        cursor: Optional[Cursor] = None
     ) -> List[ChatMessage]:
         """
-        Get chat messages for a user
+        Get chat messages for a user, oldest first, by cursor or skip/limit
         """
-        query = select(ChatMessage).where(
-            ChatMessage.user_id == user_id
-        ).order_by(
-            ChatMessage.created_at.asc()
+        query = select(ChatMessage).where(ChatMessage.user_id == user_id)
+        query = apply_cursor(
+            query, ChatMessage.created_at, ChatMessage.id, cursor, descending=False
         ).offset(skip).limit(limit)
         
         result = await db.execute(query)
         return result.scalars().all()
     
-    async def get_unread_counts(
-        self, db: AsyncSession, *, admin: bool = False
-    ) -> List[dict]:
-        """
-        Get unread message counts grouped by user
-        For admin: count of unread messages from users
-        For users: not applicable (would be implemented client-side)
-        """
-        if admin:
-            # This would be a complex query to get counts of unread messages by user
-            # For simplicity in this example, we'll return a placeholder
-            # In a real implementation, this would use a more efficient SQL query
-            # with group by and aggregation
-            return []
-        return []
+    async def get_conversations(
+        self, db: AsyncSession, *, limit: int = 50, cursor: Optional[Cursor] = None,
+        unread_only: bool = False
+    ) -> List[Any]:
+        """
+        Get the admin inbox: one summary row per user, most recent first
+        Reads only the summary table, so the cost is proportional to the page
+        """
+        query = select(
+            ChatConversation.user_id,
+            ChatConversation.unread_from_user,
+            ChatConversation.unread_from_admin,
+            ChatConversation.last_message_at,
+            ChatConversation.last_message_preview,
+            User.email,
+            User.full_name
+        ).join(User, User.id == ChatConversation.user_id)
+        if unread_only:
+            query = query.where(ChatConversation.unread_from_user > 0)
+        query = apply_cursor(
+            query, ChatConversation.last_message_at, ChatConversation.user_id, cursor
+        ).limit(limit)
+        result = await db.execute(query)
+        return result.all()
         
     async def create_user_message(
         self, db: AsyncSession, *, obj_in: ChatMessageCreate, user_id: UUID
@@ -61,8 +77,8 @@ class CRUDChatMessage:
             is_read=False
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        await self._record_message(db, db_obj)
         return db_obj
         
     async def create_admin_message(
@@ -80,31 +96,100 @@ class CRUDChatMessage:
             is_read=False
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        await self._record_message(db, db_obj)
         return db_obj
         
     async def mark_as_read(
-        self, db: AsyncSession, *, message_ids: List[UUID]
+        self, db: AsyncSession, *, message_ids: List[UUID],
+        user_id: Optional[UUID] = None, from_admin: Optional[bool] = None
+    ) -> int:
+        """
+        Mark messages as read with a single UPDATE
+        Optionally restricted to one user's conversation and one direction
+        Returns number of messages updated
+        """
+        if not message_ids:
+            return 0
+        ids = bindparam("ids", value=list(message_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+        query = update(ChatMessage).where(ChatMessage.id == any_(ids))
+        if user_id is not None:
+            query = query.where(ChatMessage.user_id == user_id)
+        if from_admin is not None:
+            query = query.where(ChatMessage.is_from_admin == from_admin)
+        return await self._mark_read(db, query)
+
+    async def mark_as_read_up_to(
+        self, db: AsyncSession, *, user_id: UUID, from_admin: bool,
+        cursor: Optional[Cursor] = None
     ) -> int:
         """
-        Mark messages as read
+        Mark every message in a user's conversation up to and including the
+        cursor position as read (all of them if no cursor is given)
         Returns number of messages updated
         """
-        # In a real implementation, this would use a bulk update operation
-        count = 0
-        for msg_id in message_ids:
-            result = await db.execute(select(ChatMessage).where(ChatMessage.id == msg_id))
-            msg = result.scalars().first()
-            if msg and not msg.is_read:
-                msg.is_read = True
-                db.add(msg)
-                count += 1
-                
-        if count > 0:
-            await db.commit()
-            
-        return count
+        query = update(ChatMessage).where(
+            ChatMessage.user_id == user_id,
+            ChatMessage.is_from_admin == from_admin
+        )
+        if cursor:
+            query = query.where(
+                tuple_(ChatMessage.created_at, ChatMessage.id) <= tuple_(cursor.created_at, cursor.id)
+            )
+        return await self._mark_read(db, query)
+
+    async def _mark_read(self, db: AsyncSession, query: Update) -> int:
+        query = query.where(ChatMessage.is_read == False).values(
+            is_read=True
+        ).returning(
+            ChatMessage.user_id, ChatMessage.is_from_admin
+        ).execution_options(synchronize_session=False)
+        result = await db.execute(query)
+
+        # Decrement the matching conversation counters by what was actually marked
+        marked = Counter((row.user_id, bool(row.is_from_admin)) for row in result)
+        for (user_id, from_admin), count in marked.items():
+            column = "unread_from_admin" if from_admin else "unread_from_user"
+            await db.execute(
+                update(ChatConversation).where(
+                    ChatConversation.user_id == user_id
+                ).values(
+                    {column: func.greatest(getattr(ChatConversation, column) - count, 0)}
+                ).execution_options(synchronize_session=False)
+            )
+        return sum(marked.values())
+
+    async def _record_message(self, db: AsyncSession, message: ChatMessage):
+        """
+        Upsert the conversation summary for a newly created message
+        """
+        preview = message.message[:PREVIEW_LENGTH]
+        query = insert(ChatConversation).values(
+            user_id=message.user_id,
+            unread_from_user=0 if message.is_from_admin else 1,
+            unread_from_admin=1 if message.is_from_admin else 0,
+            last_message_at=message.created_at,
+            last_message_preview=preview
+        )
+        counter = "unread_from_admin" if message.is_from_admin else "unread_from_user"
+        query = query.on_conflict_do_update(
+            index_elements=[ChatConversation.user_id],
+            set_={
+                counter: getattr(ChatConversation, counter) + 1,
+                "last_message_at": func.greatest(
+                    ChatConversation.last_message_at, query.excluded.last_message_at
+                ),
+                # A message committed late must not overwrite a newer preview
+                "last_message_preview": case(
+                    (
+                        query.excluded.last_message_at >= ChatConversation.last_message_at,
+                        query.excluded.last_message_preview
+                    ),
+                    else_=ChatConversation.last_message_preview
+                ),
+            }
+        )
+        await db.execute(query)
 
 
 chat_message = CRUDChatMessage()
\ No newline at end of file
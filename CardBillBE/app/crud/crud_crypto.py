@@ -1,41 +1,71 @@
-from typing import Any, Dict, Optional, List
+from datetime import datetime
+from typing import Any, Dict, Optional, List, Tuple, Union, Sequence
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.crypto import Crypto, CryptoTransaction
-from app.models.user import User
-from app.schemas.crypto import CryptoCreate, CryptoUpdate, CryptoTransactionCreate, CryptoTransactionUpdate
+from app.core.catalog_cache import catalog_cache
+from app.utils.invalidation_bus import invalidation_bus
+from app.db.session import run_after_commit
+from app.models.crypto import Crypto, CryptoTransaction, TransactionStatus
+from app.schemas.crypto import (
+    Crypto as CryptoSchema, CryptoCreate, CryptoUpdate,
+    CryptoTransactionCreate, CryptoTransactionUpdate, CryptoTransactionListItem
+)
+from app.db.projection import columns_for
+from app.utils.admin_feed import admin_feed
+from app.utils.pagination import Cursor, apply_cursor
 
 
 class CRUDCrypto:
+    def _publish_change(self, db: AsyncSession, id: UUID):
+        """
+        Invalidate the catalog on every worker once the write has committed
+        """
+        run_after_commit(db, lambda: invalidation_bus.publish("crypto", id))
+
     async def get(self, db: AsyncSession, id: UUID) -> Optional[Crypto]:
         """
-        Get a crypto by ID
+        Get a crypto row by ID (for updates; reads should use get_cached)
         """
         result = await db.execute(select(Crypto).where(Crypto.id == id))
         return result.scalars().first()
+
+    async def get_cached(self, db: AsyncSession, id: Union[UUID, str]) -> Optional[CryptoSchema]:
+        """
+        Get a crypto by ID from the catalog snapshot
+        """
+        try:
+            id = UUID(str(id))
+        except ValueError:
+            return None
+        snapshot = await catalog_cache.get(db)
+        return snapshot.cryptos_by_id.get(id)
         
-    async def get_by_symbol(self, db: AsyncSession, symbol: str) -> Optional[Crypto]:
+    async def get_by_symbol(self, db: AsyncSession, symbol: str) -> Optional[CryptoSchema]:
         """
-        Get a crypto by symbol
+        Get a crypto by symbol from the catalog snapshot
         """
-        result = await db.execute(select(Crypto).where(Crypto.symbol == symbol))
-        return result.scalars().first()
+        snapshot = await catalog_cache.get(db)
+        return snapshot.cryptos_by_symbol.get(symbol)
         
+    async def get_catalog_stamp(self, db: AsyncSession) -> Tuple[Optional[datetime], int]:
+        """
+        Latest updated_at and row count of all cryptos, from the catalog snapshot
+        """
+        snapshot = await catalog_cache.get(db)
+        return snapshot.cryptos_stamp
+
     async def get_multi(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100, active_only: bool = True
-    ) -> List[Crypto]:
+    ) -> List[CryptoSchema]:
         """
-        Get multiple cryptos with pagination
+        Get multiple cryptos with pagination, from the catalog snapshot
         """
-        query = select(Crypto)
-        if active_only:
-            query = query.where(Crypto.is_active == True)
-        query = query.offset(skip).limit(limit)
-        result = await db.execute(query)
-        return result.scalars().all()
+        snapshot = await catalog_cache.get(db)
+        items = snapshot.active_cryptos if active_only else snapshot.cryptos
+        return list(items[skip:skip + limit])
         
     async def create(self, db: AsyncSession, *, obj_in: CryptoCreate) -> Crypto:
         """
@@ -50,8 +80,8 @@ class CRUDCrypto:
             is_active=obj_in.is_active
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        self._publish_change(db, db_obj.id)
         return db_obj
         
     async def update(
@@ -60,13 +90,13 @@ class CRUDCrypto:
         """
         Update a crypto
         """
-        update_data = obj_in.dict(exclude_unset=True)
+        update_data = obj_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
             
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        self._publish_change(db, db_obj.id)
         return db_obj
         
     async def delete(self, db: AsyncSession, *, id: UUID) -> Crypto:
@@ -77,8 +107,8 @@ class CRUDCrypto:
         if obj:
             obj.is_active = False
             db.add(obj)
-            await db.commit()
-            await db.refresh(obj)
+            await db.flush()
+            self._publish_change(db, obj.id)
         return obj
 
 
@@ -92,20 +122,27 @@ class CRUDCryptoTransaction:
         
     async def get_multi(
         self, db: AsyncSession, *, user_id: Optional[UUID] = None, 
-        skip: int = 0, limit: int = 100
-    ) -> List[CryptoTransaction]:
+        status: Optional[TransactionStatus] = None,
+        skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Row]:
         """
-        Get multiple transactions with pagination
+        Get multiple transactions, newest first, by cursor or skip/limit
         """
-        query = select(CryptoTransaction)
+        query = select(*columns_for(
+            CryptoTransaction, CryptoTransactionListItem, fields, required=("id", "created_at")
+        ))
         if user_id:
             query = query.where(CryptoTransaction.user_id == user_id)
-        query = query.order_by(CryptoTransaction.created_at.desc()).offset(skip).limit(limit)
+        if status:
+            query = query.where(CryptoTransaction.status == status)
+        query = apply_cursor(query, CryptoTransaction.created_at, CryptoTransaction.id, cursor)
+        query = query.offset(skip).limit(limit)
         result = await db.execute(query)
-        return result.scalars().all()
+        return result.all()
         
     async def create(
-        self, db: AsyncSession, *, obj_in: CryptoTransactionCreate, user: User
+        self, db: AsyncSession, *, obj_in: CryptoTransactionCreate, user_id: UUID
     ) -> CryptoTransaction:
         """
         Create a new crypto transaction
@@ -114,7 +151,7 @@ class CRUDCryptoTransaction:
         total = obj_in.amount * obj_in.price
         
         db_obj = CryptoTransaction(
-            user_id=user.id,
+            user_id=user_id,
             crypto_type=obj_in.crypto_type,
             transaction_type=obj_in.transaction_type,
             amount=obj_in.amount,
@@ -123,8 +160,8 @@ class CRUDCryptoTransaction:
             wallet_address=obj_in.wallet_address
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        admin_feed.record(db, "crypto_transaction", "created", db_obj)
         return db_obj
         
     async def update(
@@ -136,7 +173,7 @@ class CRUDCryptoTransaction:
         """
         Update a transaction
         """
-        update_data = obj_in.dict(exclude_unset=True)
+        update_data = obj_in.model_dump(exclude_unset=True)
         
         # Set admin ID if provided
         if admin_id:
@@ -146,8 +183,8 @@ class CRUDCryptoTransaction:
             setattr(db_obj, field, value)
             
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        admin_feed.record(db, "crypto_transaction", "updated", db_obj)
         return db_obj
 
 
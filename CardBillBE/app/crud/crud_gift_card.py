@@ -1,34 +1,71 @@
-from typing import Any, Dict, Optional, List
+from datetime import datetime
+from typing import Any, Dict, Optional, List, Tuple, Union, Sequence
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.gift_card import GiftCard, GiftCardTransaction
-from app.models.user import User
-from app.schemas.gift_card import GiftCardCreate, GiftCardUpdate, GiftCardTransactionCreate, GiftCardTransactionUpdate
+from app.core.catalog_cache import catalog_cache
+from app.utils.invalidation_bus import invalidation_bus
+from app.db.session import run_after_commit
+from app.models.gift_card import GiftCard, GiftCardTransaction, GiftCardType
+from app.models.crypto import TransactionStatus
+from app.schemas.gift_card import (
+    GiftCard as GiftCardSchema, GiftCardCreate, GiftCardUpdate,
+    GiftCardTransactionCreate, GiftCardTransactionUpdate, GiftCardTransactionListItem
+)
+from app.db.projection import columns_for
+from app.utils.admin_feed import admin_feed
+from app.utils.pagination import Cursor, apply_cursor
 
 
 class CRUDGiftCard:
+    def _publish_change(self, db: AsyncSession, id: UUID):
+        """
+        Invalidate the catalog on every worker once the write has committed
+        """
+        run_after_commit(db, lambda: invalidation_bus.publish("gift_card", id))
+
     async def get(self, db: AsyncSession, id: UUID) -> Optional[GiftCard]:
         """
-        Get a gift card by ID
+        Get a gift card row by ID (for updates; reads should use get_cached)
         """
         result = await db.execute(select(GiftCard).where(GiftCard.id == id))
         return result.scalars().first()
+
+    async def get_cached(self, db: AsyncSession, id: Union[UUID, str]) -> Optional[GiftCardSchema]:
+        """
+        Get a gift card by ID from the catalog snapshot
+        """
+        try:
+            id = UUID(str(id))
+        except ValueError:
+            return None
+        snapshot = await catalog_cache.get(db)
+        return snapshot.gift_cards_by_id.get(id)
         
-    async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, active_only: bool = True
-    ) -> List[GiftCard]:
+    async def get_catalog_stamp(self, db: AsyncSession) -> Tuple[Optional[datetime], int]:
         """
-        Get multiple gift cards with pagination
+        Latest updated_at and row count of all gift cards, from the catalog snapshot
         """
-        query = select(GiftCard)
-        if active_only:
-            query = query.where(GiftCard.is_active == True)
-        query = query.offset(skip).limit(limit)
-        result = await db.execute(query)
-        return result.scalars().all()
+        snapshot = await catalog_cache.get(db)
+        return snapshot.gift_cards_stamp
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, active_only: bool = True,
+        type: Optional[GiftCardType] = None
+    ) -> List[GiftCardSchema]:
+        """
+        Get multiple gift cards with pagination, from the catalog snapshot
+        """
+        snapshot = await catalog_cache.get(db)
+        if type is not None and active_only:
+            items = snapshot.active_gift_cards_by_type.get(type, ())
+        elif type is not None:
+            items = tuple(g for g in snapshot.gift_cards if g.type == type)
+        else:
+            items = snapshot.active_gift_cards if active_only else snapshot.gift_cards
+        return list(items[skip:skip + limit])
         
     async def create(self, db: AsyncSession, *, obj_in: GiftCardCreate) -> GiftCard:
         """
@@ -45,8 +82,8 @@ class CRUDGiftCard:
             is_active=obj_in.is_active
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        self._publish_change(db, db_obj.id)
         return db_obj
         
     async def update(
@@ -55,13 +92,13 @@ class CRUDGiftCard:
         """
         Update a gift card
         """
-        update_data = obj_in.dict(exclude_unset=True)
+        update_data = obj_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
             
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        self._publish_change(db, db_obj.id)
         return db_obj
         
     async def delete(self, db: AsyncSession, *, id: UUID) -> GiftCard:
@@ -72,8 +109,8 @@ class CRUDGiftCard:
         if obj:
             obj.is_active = False
             db.add(obj)
-            await db.commit()
-            await db.refresh(obj)
+            await db.flush()
+            self._publish_change(db, obj.id)
         return obj
 
 
@@ -87,20 +124,27 @@ class CRUDGiftCardTransaction:
         
     async def get_multi(
         self, db: AsyncSession, *, user_id: Optional[UUID] = None, 
-        skip: int = 0, limit: int = 100
-    ) -> List[GiftCardTransaction]:
+        status: Optional[TransactionStatus] = None,
+        skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Row]:
         """
-        Get multiple gift card transactions with pagination
+        Get multiple gift card transactions, newest first, by cursor or skip/limit
         """
-        query = select(GiftCardTransaction)
+        query = select(*columns_for(
+            GiftCardTransaction, GiftCardTransactionListItem, fields, required=("id", "created_at")
+        ))
         if user_id:
             query = query.where(GiftCardTransaction.user_id == user_id)
-        query = query.order_by(GiftCardTransaction.created_at.desc()).offset(skip).limit(limit)
+        if status:
+            query = query.where(GiftCardTransaction.status == status)
+        query = apply_cursor(query, GiftCardTransaction.created_at, GiftCardTransaction.id, cursor)
+        query = query.offset(skip).limit(limit)
         result = await db.execute(query)
-        return result.scalars().all()
+        return result.all()
         
     async def create(
-        self, db: AsyncSession, *, obj_in: GiftCardTransactionCreate, user: User
+        self, db: AsyncSession, *, obj_in: GiftCardTransactionCreate, user_id: UUID
     ) -> GiftCardTransaction:
         """
         Create a new gift card transaction
@@ -109,7 +153,7 @@ class CRUDGiftCardTransaction:
         total = obj_in.amount * obj_in.price
         
         db_obj = GiftCardTransaction(
-            user_id=user.id,
+            user_id=user_id,
             gift_card_id=obj_in.gift_card_id,
             transaction_type=obj_in.transaction_type,
             amount=obj_in.amount,
@@ -121,8 +165,8 @@ class CRUDGiftCardTransaction:
             notes=obj_in.notes
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        admin_feed.record(db, "gift_card_transaction", "created", db_obj)
         return db_obj
         
     async def update(
@@ -134,7 +178,7 @@ class CRUDGiftCardTransaction:
         """
         Update a gift card transaction
         """
-        update_data = obj_in.dict(exclude_unset=True)
+        update_data = obj_in.model_dump(exclude_unset=True)
         
         # Set admin ID if provided
         if admin_id:
@@ -144,8 +188,8 @@ class CRUDGiftCardTransaction:
             setattr(db_obj, field, value)
             
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        admin_feed.record(db, "gift_card_transaction", "updated", db_obj)
         return db_obj
 
 
@@ -1,16 +1,26 @@
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Union, List, Sequence
 from uuid import UUID
 import secrets
 import string
 from datetime import datetime, timedelta
 
 from pydantic import EmailStr
-from sqlalchemy import select
+from sqlalchemy import select, update, Row
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import security
+from app.core.token_versions import token_versions
+from app.db.projection import columns_for
+from app.db.session import run_after_commit
+from app.utils.invalidation_bus import invalidation_bus
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
+
+# Privilege claims in access tokens; changing one (or the password) revokes
+# issued tokens. The other claims (email, is_verified) are informational and
+# refresh at the user's next login.
+REVOKING_FIELDS = ("is_active", "is_admin")
 
 
 class CRUDUser:
@@ -21,6 +31,13 @@ class CRUDUser:
         result = await db.execute(select(User).where(User.id == id))
         return result.scalars().first()
 
+    async def get_token_version(self, db: AsyncSession, id: UUID) -> Optional[int]:
+        """
+        Get a user's current token version, or None if the user does not exist
+        """
+        result = await db.execute(select(User.token_version).where(User.id == id))
+        return result.scalar_one_or_none()
+
     async def get_by_username(self, db: AsyncSession, username: str) -> Optional[User]:
         """
         Get a user by username
@@ -35,13 +52,16 @@ class CRUDUser:
 
         
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
-    ) -> List[User]:
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Row]:
         """
-        Get multiple users with pagination
+        Get multiple users with pagination (response columns only, no secrets)
         """
-        result = await db.execute(select(User).offset(skip).limit(limit))
-        return result.scalars().all()
+        result = await db.execute(
+            select(*columns_for(User, UserSchema, fields)).offset(skip).limit(limit)
+        )
+        return result.all()
         
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         """
@@ -51,7 +71,7 @@ class CRUDUser:
         
         db_obj = User(
             email=obj_in.email,
-            password=security.get_password_hash(obj_in.password),
+            password=await security.get_password_hash_async(obj_in.password),
             full_name=obj_in.full_name,
             # username=obj_in.username,
             is_active=obj_in.is_active,
@@ -61,8 +81,7 @@ class CRUDUser:
             verification_code=verification_code
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
         return db_obj
         
     async def update(
@@ -74,19 +93,26 @@ class CRUDUser:
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
-            update_data = obj_in.dict(exclude_unset=True)
+            update_data = obj_in.model_dump(exclude_unset=True)
+
+        revoke_tokens = bool(update_data.get("password")) or any(
+            field in update_data and update_data[field] != getattr(db_obj, field)
+            for field in REVOKING_FIELDS
+        )
             
         if "password" in update_data and update_data["password"]:
-            hashed_password = security.get_password_hash(update_data["password"])
+            hashed_password = await security.get_password_hash_async(update_data["password"])
             del update_data["password"]
             update_data["password"] = hashed_password
             
         for field, value in update_data.items():
             setattr(db_obj, field, value)
+        if revoke_tokens:
+            self._revoke_tokens(db, db_obj)
             
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        self._invalidate_principal(db, db_obj.id)
         return db_obj
         
     async def delete(self, db: AsyncSession, *, id: UUID) -> User:
@@ -96,9 +122,84 @@ class CRUDUser:
         obj = await self.get(db, id=id)
         if obj:
             await db.delete(obj)
-            await db.commit()
+            await db.flush()
+            self._invalidate_principal(db, obj.id)
+            self._publish_token_version(db, obj.id, None)
         return obj
         
+    async def debit_balance(
+        self, db: AsyncSession, *, user_id: UUID, amount: float
+    ) -> Optional[float]:
+        """
+        Atomically subtract amount from a user's balance if it covers it
+        Returns the new balance, or None if the balance was insufficient
+        """
+        result = await db.execute(
+            update(User).where(
+                User.id == user_id, User.balance >= amount
+            ).values(
+                balance=User.balance - amount
+            ).returning(User.balance).execution_options(synchronize_session=False)
+        )
+        balance = result.scalar_one_or_none()
+        if balance is not None:
+            self._sync_balance(db, user_id, balance)
+        return balance
+
+    async def credit_balance(
+        self, db: AsyncSession, *, user_id: UUID, amount: float
+    ) -> Optional[float]:
+        """
+        Atomically add amount to a user's balance
+        Returns the new balance, or None if the user does not exist
+        """
+        result = await db.execute(
+            update(User).where(
+                User.id == user_id
+            ).values(
+                balance=User.balance + amount
+            ).returning(User.balance).execution_options(synchronize_session=False)
+        )
+        balance = result.scalar_one_or_none()
+        if balance is not None:
+            self._sync_balance(db, user_id, balance)
+        return balance
+
+    def _invalidate_principal(self, db: AsyncSession, user_id: UUID):
+        """
+        Drop the cached principal on every worker once this request's changes are committed
+        """
+        run_after_commit(db, lambda: invalidation_bus.publish("user", user_id))
+
+    def _publish_token_version(self, db: AsyncSession, user_id: UUID, version: Optional[int]):
+        """
+        Announce a user's new token version (None once deleted) after commit
+        """
+        async def publish():
+            if version is None:
+                await token_versions.invalidate(user_id)
+            else:
+                await token_versions.set(user_id, version)
+            await invalidation_bus.publish("token_version", user_id, version)
+
+        run_after_commit(db, publish)
+
+    def _revoke_tokens(self, db: AsyncSession, user: User):
+        """
+        Bump the user's token version so previously issued tokens stop validating
+        """
+        version = (user.token_version or 0) + 1
+        user.token_version = version
+        self._publish_token_version(db, user.id, version)
+
+    def _sync_balance(self, db: AsyncSession, user_id: UUID, balance: float):
+        """
+        Refresh the balance of an already-loaded User without marking it dirty
+        """
+        loaded = db.identity_map.get(db.identity_key(User, user_id))
+        if loaded is not None:
+            set_committed_value(loaded, "balance", balance)
+
     async def authenticate(
         self, db: AsyncSession, *, email:EmailStr, password: str
     ) -> Optional[User]:
@@ -108,7 +209,7 @@ class CRUDUser:
         user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not security.verify_password(password, user.password):
+        if not await security.verify_password_async(password, user.password):
             return None
         return user
         
@@ -126,8 +227,8 @@ class CRUDUser:
         user.verification_code = None
         
         db.add(user)
-        await db.commit()
-        await db.refresh(user)
+        await db.flush()
+        self._invalidate_principal(db, user.id)
         return user
         
     async def create_reset_code(
@@ -147,8 +248,7 @@ class CRUDUser:
         user.reset_code_expires = expires
         
         db.add(user)
-        await db.commit()
-        await db.refresh(user)
+        await db.flush()
         return user
         
     async def reset_password(
@@ -163,13 +263,13 @@ class CRUDUser:
             user.reset_code_expires < datetime.utcnow()):
             return None
             
-        user.password = security.get_password_hash(new_password)
+        user.password = await security.get_password_hash_async(new_password)
         user.reset_code = None
         user.reset_code_expires = None
+        self._revoke_tokens(db, user)
         
         db.add(user)
-        await db.commit()
-        await db.refresh(user)
+        await db.flush()
         return user
 
 
@@ -1,15 +1,18 @@
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Union, Sequence
 from uuid import UUID
 import secrets
 import string
 
-from sqlalchemy import select
+from sqlalchemy import select, update, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.vtu import VTUTransaction
 from app.models.crypto import TransactionStatus
-from app.models.user import User
-from app.schemas.vtu import VTUTransactionCreate, VTUTransactionUpdate
+from app.crud.crud_user import user as crud_user
+from app.schemas.vtu import VTUTransactionCreate, VTUTransactionUpdate, VTUTransactionListItem
+from app.db.projection import columns_for
+from app.utils.admin_feed import admin_feed
+from app.utils.pagination import Cursor, apply_cursor
 
 
 class CRUDVTUTransaction:
@@ -22,26 +25,32 @@ class CRUDVTUTransaction:
         
     async def get_multi(
         self, db: AsyncSession, *, user_id: Optional[UUID] = None, 
-        skip: int = 0, limit: int = 100
-    ) -> List[VTUTransaction]:
+        skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Row]:
         """
-        Get multiple VTU transactions with pagination
+        Get multiple VTU transactions, newest first, by cursor or skip/limit
         """
-        query = select(VTUTransaction)
+        query = select(*columns_for(
+            VTUTransaction, VTUTransactionListItem, fields, required=("id", "created_at")
+        ))
         if user_id:
             query = query.where(VTUTransaction.user_id == user_id)
-        query = query.order_by(VTUTransaction.created_at.desc()).offset(skip).limit(limit)
+        query = apply_cursor(query, VTUTransaction.created_at, VTUTransaction.id, cursor)
+        query = query.offset(skip).limit(limit)
         result = await db.execute(query)
-        return result.scalars().all()
+        return result.all()
         
     async def create(
-        self, db: AsyncSession, *, obj_in: VTUTransactionCreate, user: User
+        self, db: AsyncSession, *, obj_in: VTUTransactionCreate, user_id: UUID
     ) -> VTUTransaction:
         """
         Create a new VTU transaction
         """
-        # Check if user has sufficient balance
-        if user.balance < obj_in.amount:
+        # Debit the balance in one conditional UPDATE so concurrent requests
+        # can't both spend the same funds
+        balance = await crud_user.debit_balance(db, user_id=user_id, amount=obj_in.amount)
+        if balance is None:
             raise ValueError("Insufficient balance")
             
         # Generate unique reference
@@ -49,7 +58,7 @@ class CRUDVTUTransaction:
         
         # Create transaction
         db_obj = VTUTransaction(
-            user_id=user.id,
+            user_id=user_id,
             service_type=obj_in.service_type,
             provider=obj_in.provider,
             recipient=obj_in.recipient,
@@ -58,49 +67,59 @@ class CRUDVTUTransaction:
             status=TransactionStatus.PENDING
         )
         
-        # Deduct amount from user's balance
-        user.balance -= obj_in.amount
-        
-        # Add objects to session
         db.add(db_obj)
-        db.add(user)
         
-        # Commit transaction
-        await db.commit()
-        await db.refresh(db_obj)
-        await db.refresh(user)
+        # Send the INSERT now; the request commits once, before responding
+        await db.flush()
+        admin_feed.record(db, "vtu_transaction", "created", db_obj)
         
         return db_obj
         
     async def update(
-        self, db: AsyncSession, *, db_obj: VTUTransaction, obj_in: VTUTransactionUpdate
+        self, db: AsyncSession, *, db_obj: VTUTransaction,
+        obj_in: Union[VTUTransactionUpdate, Dict[str, Any]]
     ) -> VTUTransaction:
         """
         Update a VTU transaction
         """
-        update_data = obj_in.dict(exclude_unset=True)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
         
-        # If status is changed to FAILED, refund the user
-        if (obj_in.status == TransactionStatus.FAILED and 
+        # If status is changed to FAILED, refund the user. The status change is
+        # claimed with a conditional UPDATE first so a refund can only happen once.
+        if (update_data.get("status") == TransactionStatus.FAILED and 
                 db_obj.status != TransactionStatus.FAILED):
-            # Get user
-            result = await db.execute(select(User).where(User.id == db_obj.user_id))
-            user = result.scalars().first()
-            
-            if user:
-                # Refund the amount
-                user.balance += db_obj.amount
-                db.add(user)
+            if await self._claim_status(db, db_obj=db_obj, status=TransactionStatus.FAILED):
+                await crud_user.credit_balance(db, user_id=db_obj.user_id, amount=db_obj.amount)
         
         # Update transaction object
         for field, value in update_data.items():
             setattr(db_obj, field, value)
             
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        admin_feed.record(db, "vtu_transaction", "updated", db_obj)
         
         return db_obj
 
+    async def _claim_status(
+        self, db: AsyncSession, *, db_obj: VTUTransaction, status: TransactionStatus
+    ) -> bool:
+        """
+        Move a transaction to status unless it is already there
+        Returns False if another request got there first
+        """
+        result = await db.execute(
+            update(VTUTransaction).where(
+                VTUTransaction.id == db_obj.id,
+                VTUTransaction.status.is_distinct_from(status)
+            ).values(status=status).returning(VTUTransaction.id).execution_options(
+                synchronize_session=False
+            )
+        )
+        return result.first() is not None
+
 
 vtu_transaction = CRUDVTUTransaction()
\ No newline at end of file
@@ -1,13 +1,16 @@
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Sequence
 from uuid import UUID
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import select, update, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.withdrawal import Withdrawal, WithdrawalStatus
-from app.models.user import User
-from app.schemas.withdrawal import WithdrawalCreate, WithdrawalUpdate
+from app.crud.crud_user import user as crud_user
+from app.schemas.withdrawal import WithdrawalCreate, WithdrawalUpdate, WithdrawalListItem
+from app.db.projection import columns_for
+from app.utils.admin_feed import admin_feed
+from app.utils.pagination import Cursor, apply_cursor
 
 
 class CRUDWithdrawal:
@@ -21,12 +24,15 @@ class CRUDWithdrawal:
     async def get_multi(
         self, db: AsyncSession, *, user_id: Optional[UUID] = None, 
         status: Optional[WithdrawalStatus] = None,
-        skip: int = 0, limit: int = 100
-    ) -> List[Withdrawal]:
+        skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Row]:
         """
-        Get multiple withdrawals with pagination
+        Get multiple withdrawals, newest first, by cursor or skip/limit
         """
-        query = select(Withdrawal)
+        query = select(*columns_for(
+            Withdrawal, WithdrawalListItem, fields, required=("id", "created_at")
+        ))
         
         if user_id:
             query = query.where(Withdrawal.user_id == user_id)
@@ -34,12 +40,13 @@ class CRUDWithdrawal:
         if status:
             query = query.where(Withdrawal.status == status)
             
-        query = query.order_by(Withdrawal.created_at.desc()).offset(skip).limit(limit)
+        query = apply_cursor(query, Withdrawal.created_at, Withdrawal.id, cursor)
+        query = query.offset(skip).limit(limit)
         result = await db.execute(query)
-        return result.scalars().all()
+        return result.all()
         
     async def create(
-        self, db: AsyncSession, *, obj_in: WithdrawalCreate, user: User
+        self, db: AsyncSession, *, obj_in: WithdrawalCreate, user_id: UUID
     ) -> Withdrawal:
         """
         Create a new withdrawal request
@@ -48,13 +55,15 @@ class CRUDWithdrawal:
         fee = obj_in.amount * 0.02
         total = obj_in.amount - fee
         
-        # Check if user has sufficient balance
-        if user.balance < obj_in.amount:
+        # Debit the balance in one conditional UPDATE so concurrent requests
+        # can't both spend the same funds
+        balance = await crud_user.debit_balance(db, user_id=user_id, amount=obj_in.amount)
+        if balance is None:
             raise ValueError("Insufficient balance")
             
         # Create withdrawal request
         db_obj = Withdrawal(
-            user_id=user.id,
+            user_id=user_id,
             amount=obj_in.amount,
             fee=fee,
             total=total,
@@ -63,17 +72,11 @@ class CRUDWithdrawal:
             status=WithdrawalStatus.PENDING
         )
         
-        # Deduct amount from user's balance
-        user.balance -= obj_in.amount
-        
-        # Add objects to session
         db.add(db_obj)
-        db.add(user)
         
-        # Commit transaction
-        await db.commit()
-        await db.refresh(db_obj)
-        await db.refresh(user)
+        # Send the INSERT now; the request commits once, before responding
+        await db.flush()
+        admin_feed.record(db, "withdrawal", "created", db_obj)
         
         return db_obj
         
@@ -86,23 +89,19 @@ class CRUDWithdrawal:
         """
         Update a withdrawal
         """
-        update_data = obj_in.dict(exclude_unset=True)
+        update_data = obj_in.model_dump(exclude_unset=True)
         
         # Set admin ID if provided
         if admin_id:
             update_data["admin_id"] = admin_id
             
-        # If status is changed to REJECTED, refund the user
+        # If status is changed to REJECTED, refund the user. The status change is
+        # claimed with a conditional UPDATE first so a refund can only happen once.
         if (obj_in.status == WithdrawalStatus.REJECTED and 
                 db_obj.status != WithdrawalStatus.REJECTED):
-            # Get user
-            result = await db.execute(select(User).where(User.id == db_obj.user_id))
-            user = result.scalars().first()
-            
-            if user:
+            if await self._claim_status(db, db_obj=db_obj, status=WithdrawalStatus.REJECTED):
                 # Refund the original amount
-                user.balance += db_obj.amount
-                db.add(user)
+                await crud_user.credit_balance(db, user_id=db_obj.user_id, amount=db_obj.amount)
                 
             # Set processed time
             update_data["processed_at"] = datetime.utcnow()
@@ -117,10 +116,27 @@ class CRUDWithdrawal:
             setattr(db_obj, field, value)
             
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        admin_feed.record(db, "withdrawal", "updated", db_obj)
         
         return db_obj
 
+    async def _claim_status(
+        self, db: AsyncSession, *, db_obj: Withdrawal, status: WithdrawalStatus
+    ) -> bool:
+        """
+        Move a withdrawal to status unless it is already there
+        Returns False if another request got there first
+        """
+        result = await db.execute(
+            update(Withdrawal).where(
+                Withdrawal.id == db_obj.id,
+                Withdrawal.status.is_distinct_from(status)
+            ).values(status=status).returning(Withdrawal.id).execution_options(
+                synchronize_session=False
+            )
+        )
+        return result.first() is not None
+
 
 withdrawal = CRUDWithdrawal()
\ No newline at end of file
@@ -3,5 +3,5 @@ from app.models.user import User
 from app.models.crypto import Crypto, CryptoTransaction
 from app.models.gift_card import GiftCard, GiftCardTransaction
 from app.models.withdrawal import Withdrawal
-from app.models.chat import ChatMessage
+from app.models.chat import ChatMessage, ChatConversation
 from app.models.vtu import VTUTransaction
\ No newline at end of file
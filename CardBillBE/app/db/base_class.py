@@ -7,6 +7,10 @@ from sqlalchemy.orm import DeclarativeBase
 class Base(DeclarativeBase):
     id: Any
     __name__: str
+
+    # Fetch server-generated values with INSERT/UPDATE ... RETURNING at flush
+    # time instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     # Generate __tablename__ automatically
     @declared_attr
@@ -0,0 +1,26 @@
+from typing import Any, List, Optional, Sequence, Type
+
+from pydantic import BaseModel
+
+
+def columns_for(
+    model: Any, schema: Type[BaseModel],
+    fields: Optional[Sequence[str]] = None, required: Sequence[str] = ()
+) -> List[Any]:
+    """
+    Model columns named by a schema's fields, for list queries that
+    select() only what the response shows
+
+    `fields` narrows the selection further (e.g. from a fields= query
+    parameter); `required` columns, such as the ones a cursor is built
+    from, are always selected. The rows come back as plain Row tuples,
+    which the schema validates via from_attributes without ORM
+    identity-map or instrumentation cost.
+
+    Schema fields the model has no column for (e.g. request-only gift
+    card details) are skipped and validate to their defaults.
+    """
+    names = list(fields) if fields else list(schema.model_fields)
+    names += [name for name in required if name not in names]
+    mapped = model.__table__.columns.keys()
+    return [getattr(model, name) for name in names if name in mapped]
@@ -0,0 +1,112 @@
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\?(?:, \?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a SQL statement so executions differing only in bound values match
+    """
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """
+    SQL statements executed while handling a single request
+    """
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_time * 1000
+
+    def most_repeated(self) -> Optional[Tuple[str, int]]:
+        """
+        The statement shape executed most often, with its count
+        """
+        if not self.shapes:
+            return None
+        return self.shapes.most_common(1)[0]
+
+    def server_timing(self) -> str:
+        """
+        Value for the Server-Timing response header
+        """
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries"'
+
+
+# Stats for the request currently being handled (None outside a request)
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+class RouteQuerySummary:
+    """
+    Rolling per-route window of statement counts and DB time
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self._samples: Dict[str, Deque[Tuple[int, float]]] = {}
+
+    def record(self, route: str, stats: QueryStats):
+        samples = self._samples.get(route)
+        if samples is None:
+            samples = self._samples[route] = deque(maxlen=self.window)
+        samples.append((stats.count, stats.total_ms))
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        summary = []
+        for route, samples in self._samples.items():
+            counts = [count for count, _ in samples]
+            times = sorted(ms for _, ms in samples)
+            summary.append({
+                "route": route,
+                "requests": len(samples),
+                "avg_statements": round(sum(counts) / len(counts), 2),
+                "max_statements": max(counts),
+                "avg_db_ms": round(sum(times) / len(times), 3),
+                "p95_db_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+            })
+        return sorted(summary, key=lambda row: row["avg_db_ms"], reverse=True)
+
+
+route_query_summary = RouteQuerySummary(window=settings.SQL_STATS_WINDOW)
+
+
+def register_query_hooks(engine: Engine):
+    """
+    Attach cursor execution hooks that feed the current request's QueryStats
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_query_stats.get() is not None:
+            conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_query_stats.get()
+        start_times = conn.info.get("query_start_time")
+        if stats is not None and start_times:
+            stats.record(statement, time.perf_counter() - start_times.pop())
@@ -1,37 +1,183 @@
-from typing import Generator, AsyncGenerator, Any
+import logging
+import threading
+import time
+from typing import AsyncGenerator, Any, Awaitable, Callable, Dict
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-import asyncpg
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.db.query_stats import register_query_hooks
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding callbacks to run once the request has committed
+AFTER_COMMIT_KEY = "after_commit"
+
+
+class PoolWaitStats:
+    """
+    Running totals of how long callers waited for a pooled connection
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+pool_wait_stats = PoolWaitStats()
 
-# Create async engine for PostgreSQL
-engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI, 
-    echo=True,
-    future=True
-)
 
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long each checkout had to wait
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_wait_stats.record(time.perf_counter() - start)
+        return conn
 
 
+def create_engine_from_settings() -> AsyncEngine:
+    """
+    Build the async engine using the pool settings from config
+    """
+    return create_async_engine(
+        settings.SQLALCHEMY_DATABASE_URI,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        future=True
+    )
+
+
+# Single engine (and therefore single pool) shared by the whole process
+engine = create_engine_from_settings()
+register_query_hooks(engine.sync_engine)
+
 # Create async session
 AsyncSessionLocal = sessionmaker(
-    engine, 
-    class_=AsyncSession, 
+    engine,
+    class_=AsyncSession,
     expire_on_commit=False
 )
 
-async def get_db() -> AsyncGenerator[Any, None]:
+
+def get_pool_status() -> Dict[str, Any]:
+    """
+    Live connection pool counters plus checkout wait statistics
+    """
+    pool = engine.sync_engine.pool
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        **pool_wait_stats.snapshot(),
+    }
+
+
+def run_after_commit(db: AsyncSession, callback: Callable[[], Awaitable[None]]):
+    """
+    Run callback once the request's transaction has committed
+
+    Used for cache invalidation: evicting before the commit would let a
+    concurrent request re-cache the old row. Chat notifications go out the
+    same way, so clients never see a message that was rolled back.
+    """
+    db.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+async def _run_after_commit_callbacks(db: AsyncSession):
+    for callback in db.info.pop(AFTER_COMMIT_KEY, []):
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"After-commit callback failed: {str(e)}")
+
+
+async def commit_session(db: AsyncSession):
+    """
+    Commit the request's transaction, then run its after-commit callbacks
+    """
+    await db.commit()
+    await _run_after_commit_callbacks(db)
+
+
+async def get_db(request: Request) -> AsyncGenerator[Any, None]:
     """
     Dependency for getting async db session
+
+    CRUD methods only flush; the whole request is committed once, so
+    multi-step operations succeed or fail together. The commit happens in
+    CommitBeforeResponseRoute, before the response is sent; the commit
+    after `yield` only catches routes that don't use it (and is a no-op
+    otherwise).
     """
     async with AsyncSessionLocal() as session:
+        request.state.db_session = session
         try:
             yield session
-            await session.commit()
+            await commit_session(session)
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
 
+
+class CommitBeforeResponseRoute(APIRoute):
+    """
+    Route that commits the request's session before the response is sent
+
+    On the pinned FastAPI (0.104), code after `yield` in a dependency runs
+    only once the response has gone out, so a commit failing there would
+    still leave the client with a 2xx. Committing here makes a failed
+    commit surface as an error response instead, and means a client's next
+    request always sees this one's writes.
+    """
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            response = await handler(request)
+            session = getattr(request.state, "db_session", None)
+            if session is not None:
+                await commit_session(session)
+            return response
+
+        return route_handler
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Boolean, Index, Integer
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -12,11 +12,35 @@ class ChatMessage(Base):
     """
     __tablename__ = "chat_message"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     admin_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     message = Column(Text, nullable=False)
     is_from_admin = Column(Boolean, default=False)
     is_read = Column(Boolean, default=False)
     attachment_url = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Conversation history: WHERE user_id = ? ORDER BY created_at, id
+        Index("ix_chat_message_user_id_created_at", user_id, created_at, id),
+    )
+
+
+class ChatConversation(Base):
+    """
+    Per-user chat summary, kept up to date in the same transaction as
+    chat_message writes so the admin inbox never aggregates messages
+    """
+    __tablename__ = "chat_conversation"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    unread_from_user = Column(Integer, nullable=False, default=0)
+    unread_from_admin = Column(Integer, nullable=False, default=0)
+    last_message_at = Column(DateTime, nullable=False)
+    last_message_preview = Column(String(200), nullable=True)
+
+    __table_args__ = (
+        # Admin inbox: ORDER BY last_message_at DESC, user_id DESC
+        Index("ix_chat_conversation_last_message_at", last_message_at.desc(), user_id.desc()),
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 import enum
@@ -38,7 +38,7 @@ class Crypto(Base):
     """
     Database model for crypto currencies
     """
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     symbol = Column(String(10), nullable=False, index=True)
     buy_rate = Column(Float, nullable=False)
@@ -48,13 +48,18 @@ class Crypto(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Catalog reads only ever look at active rows
+        Index("ix_crypto_active_symbol", symbol, postgresql_where=(is_active == True)),
+    )
+
 
 class CryptoTransaction(Base):
     """
     Database model for crypto transactions
     """
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     crypto_type = Column(Enum(CryptoType), nullable=False)
     transaction_type = Column(Enum(TransactionType), nullable=False)
     amount = Column(Float, nullable=False)
@@ -65,4 +70,16 @@ class CryptoTransaction(Base):
     status = Column(Enum(TransactionStatus), default=TransactionStatus.PENDING)
     admin_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # User history pages: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_cryptotransaction_user_id_created_at", user_id, created_at.desc(), id.desc()),
+        # Admin listings across all users
+        Index("ix_cryptotransaction_created_at", created_at.desc(), id.desc()),
+        # Admin pending queue
+        Index(
+            "ix_cryptotransaction_pending", created_at.desc(), id.desc(),
+            postgresql_where=(status == TransactionStatus.PENDING)
+        ),
+    )
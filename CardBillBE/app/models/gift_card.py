@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Enum, Boolean, Text
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Enum, Boolean, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 import uuid
 import enum
@@ -27,7 +27,7 @@ class GiftCard(Base):
     """
     Database model for gift card types
     """
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     type = Column(Enum(GiftCardType), nullable=False, index=True)
     buy_rate = Column(Float, nullable=False)
@@ -39,13 +39,18 @@ class GiftCard(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # Catalog reads only ever look at active rows
+        Index("ix_giftcard_active_type", type, postgresql_where=(is_active == True)),
+    )
+
 
 class GiftCardTransaction(Base):
     """
     Database model for gift card transactions
     """
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     gift_card_id = Column(UUID(as_uuid=True), ForeignKey("giftcard.id"), nullable=False)
     transaction_type = Column(Enum(TransactionType), nullable=False)
     amount = Column(Float, nullable=False)
@@ -59,3 +64,15 @@ class GiftCardTransaction(Base):
     notes = Column(Text, nullable=True, default="")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # User history pages: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_giftcardtransaction_user_id_created_at", user_id, created_at.desc(), id.desc()),
+        # Admin listings across all users
+        Index("ix_giftcardtransaction_created_at", created_at.desc(), id.desc()),
+        # Admin pending queue
+        Index(
+            "ix_giftcardtransaction_pending", created_at.desc(), id.desc(),
+            postgresql_where=(status == TransactionStatus.PENDING)
+        ),
+    )
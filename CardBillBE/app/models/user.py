@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Boolean, Column, String, DateTime, Float
+from sqlalchemy import Boolean, Column, String, DateTime, Float, Integer
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -12,7 +12,7 @@ class User(Base):
     """
     __tablename__ = "users"  # This is necessary!
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False)
     password = Column(String, nullable=False)
     full_name = Column(String, index=True)
@@ -21,6 +21,8 @@ class User(Base):
     is_verified = Column(Boolean, default=False)
     is_admin = Column(Boolean, default=False)
     balance = Column(Float, default=0.0)
+    # Bumped whenever claims baked into access tokens change; older tokens stop validating
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     verification_code = Column(String, nullable=True)
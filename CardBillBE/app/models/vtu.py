@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Enum, Text, JSON
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Enum, Text, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 import enum
@@ -24,8 +24,8 @@ class VTUTransaction(Base):
     """
     Database model for VTU transactions
     """
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     service_type = Column(Enum(VTUServiceType), nullable=False)
     provider = Column(String, nullable=False)  # e.g., MTN, Airtel, DSTV
     recipient = Column(String, nullable=False)  # Phone number or account number
@@ -35,4 +35,9 @@ class VTUTransaction(Base):
     status = Column(Enum(TransactionStatus), default=TransactionStatus.PENDING)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # User history pages: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_vtutransaction_user_id_created_at", user_id, created_at.desc(), id.desc()),
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Enum, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 import enum
@@ -30,8 +30,8 @@ class Withdrawal(Base):
     """
     Database model for withdrawals
     """
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     amount = Column(Float, nullable=False)
     fee = Column(Float, default=0.0)
     total = Column(Float, nullable=False)  # amount - fee
@@ -42,4 +42,16 @@ class Withdrawal(Base):
     notes = Column(Text, nullable=True)
     processed_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # User history pages: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_withdrawal_user_id_created_at", user_id, created_at.desc(), id.desc()),
+        # Admin listings across all users
+        Index("ix_withdrawal_created_at", created_at.desc(), id.desc()),
+        # Admin pending queue
+        Index(
+            "ix_withdrawal_pending", created_at.desc(), id.desc(),
+            postgresql_where=(status == WithdrawalStatus.PENDING)
+        ),
+    )
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, EmailStr
 
 
@@ -8,6 +10,13 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: str
+    exp: int
+    email: Optional[str] = None
+    adm: bool = False
+    act: bool = True
+    vrf: bool = False
+    # Absent on tokens issued before principal claims were added
+    ver: Optional[int] = None
 
 
 class LoginRequest(BaseModel):
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class ChatMessageBase(BaseModel):
@@ -25,10 +25,29 @@ class ChatMessage(ChatMessageBase):
     is_read: bool
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Admin inbox entry (one per user conversation)
+class ChatConversation(BaseModel):
+    user_id: UUID
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+    unread_from_user: int
+    unread_from_admin: int
+    last_message_at: datetime
+    last_message_preview: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Admin sending message
 class AdminChatMessageCreate(ChatMessageBase):
-    user_id: UUID
\ No newline at end of file
+    user_id: UUID
+
+
+# Whether a user has a live chat connection, and when they were last seen
+class UserPresence(BaseModel):
+    user_id: UUID
+    online: bool
+    last_seen: Optional[datetime] = None
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 from uuid import UUID
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator
 from app.models.crypto import CryptoType, TransactionStatus, TransactionType
 
 
@@ -32,8 +32,7 @@ class Crypto(CryptoBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Crypto Transaction Schemas
@@ -44,9 +43,10 @@ class CryptoTransactionBase(BaseModel):
     price: float = Field(..., gt=0)
     wallet_address: Optional[str] = None
     
-    @validator("wallet_address")
-    def validate_wallet_address(cls, v, values):
-        if values.get("transaction_type") == TransactionType.SELL and not v:
+    @field_validator("wallet_address")
+    @classmethod
+    def validate_wallet_address(cls, v, info: ValidationInfo):
+        if info.data.get("transaction_type") == TransactionType.SELL and not v:
             raise ValueError("Wallet address is required for sell transactions")
         return v
 
@@ -71,8 +71,26 @@ class CryptoTransaction(CryptoTransactionBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Row in transaction lists (projected columns; detail routes return CryptoTransaction)
+class CryptoTransactionListItem(BaseModel):
+    id: UUID
+    user_id: UUID
+    crypto_type: CryptoType
+    transaction_type: TransactionType
+    amount: float
+    price: float
+    total: float
+    status: TransactionStatus
+    wallet_address: Optional[str] = None
+    transaction_hash: Optional[str] = None
+    admin_id: Optional[UUID] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Admin processing transaction
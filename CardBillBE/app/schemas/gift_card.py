@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from uuid import UUID
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from app.models.gift_card import GiftCardType
 from app.models.crypto import TransactionStatus, TransactionType
 
@@ -37,8 +37,7 @@ class GiftCard(GiftCardBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class GiftCardTransactionBase(BaseModel):
@@ -56,17 +55,18 @@ class GiftCardTransactionBase(BaseModel):
     notes: Optional[str] = Field(None, alias="comments")
     email: Optional[str] = Field(None, alias="email")  # For buy transactions
 
-    @validator("card_code", "card_image_url", pre=True, always=True)
-    def validate_card_details(cls, v, values):
-        if (values.get("transaction_type") == TransactionType.SELL and
-                not values.get("card_code") and
-                not values.get("card_image_url")):
-            raise ValueError("Card code or card image is required for sell transactions")
-        return v
+    # Clients send the camelCase aliases; ORM rows and code use field names
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class GiftCardTransactionCreate(GiftCardTransactionBase):
-    pass
+    @model_validator(mode="after")
+    def validate_card_details(self):
+        if (self.transaction_type == TransactionType.SELL and
+                not self.card_code and
+                not self.card_image_url):
+            raise ValueError("Card code or card image is required for sell transactions")
+        return self
 
 
 class GiftCardTransactionUpdate(BaseModel):
@@ -84,26 +84,31 @@ class GiftCardTransaction(GiftCardTransactionBase):
     updated_at: datetime
     gift_card: Optional[GiftCard] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-class AdminGiftCardTransactionUpdate(BaseModel):
-    status: TransactionStatus
-    notes: Optional[str] = None
-
-class GiftCardTransaction(GiftCardTransactionBase):
-    id: Optional[UUID]
-    user_id:  Optional[UUID]
-    total: float = Field(..., ge=0)
+# Row in transaction lists: everything the client shows, minus the card secrets
+class GiftCardTransactionListItem(BaseModel):
+    id: UUID
+    user_id: UUID
+    gift_card_id: UUID = Field(..., alias="cardType")
+    transaction_type: TransactionType
+    country: Optional[str] = Field(None, alias="country")
+    category: Optional[str] = Field(None, alias="category")
+    card_type_option: Optional[str] = Field(None, alias="cardTypeOption")
+    receipt_type: Optional[str] = Field(None, alias="receiptType")
+    amount: float
+    price: float = Field(..., alias="totalNaira")
+    total: float
+    card_image_url: Optional[str] = None
+    notes: Optional[str] = Field(None, alias="comments")
+    email: Optional[str] = Field(None, alias="email")
     status: TransactionStatus
     admin_id: Optional[UUID] = None
     created_at: datetime
     updated_at: datetime
-    gift_card: Optional[GiftCard] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
 
 class AdminGiftCardTransactionUpdate(BaseModel):
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional, List
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 import re
 
 
@@ -24,7 +24,8 @@ class UserCreate(UserBase):
 
 
 
-    @validator("password")
+    @field_validator("password")
+    @classmethod
     def password_strength(cls, v):
         """
         Validate password strength:
@@ -48,7 +49,8 @@ class UserCreate(UserBase):
 class UserUpdate(UserBase):
     password: Optional[str] = None
     
-    @validator("password")
+    @field_validator("password")
+    @classmethod
     def password_strength(cls, v):
         if v is None:
             return v
@@ -80,7 +82,8 @@ class UserPasswordReset(BaseModel):
     reset_code: str
     new_password: str
     
-    @validator("new_password")
+    @field_validator("new_password")
+    @classmethod
     def password_strength(cls, v):
         if len(v) < 8:
             raise ValueError("Password must be at least 8 characters long")
@@ -102,8 +105,7 @@ class User(UserBase):
     updated_at: datetime
     profile_picture: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # User with token used for login response
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, Dict, Any
 from uuid import UUID
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator
 
 from app.models.vtu import VTUServiceType
 from app.models.crypto import TransactionStatus
@@ -13,10 +13,11 @@ class VTUTransactionBase(BaseModel):
     recipient: str
     amount: float = Field(..., gt=0)
     
-    @validator("recipient")
-    def validate_recipient(cls, v, values):
+    @field_validator("recipient")
+    @classmethod
+    def validate_recipient(cls, v, info: ValidationInfo):
         # Validation based on service type
-        service_type = values.get("service_type")
+        service_type = info.data.get("service_type")
         if service_type in [VTUServiceType.AIRTIME, VTUServiceType.DATA]:
             # Validate phone number format (simplified)
             if not v.replace("+", "").isdigit():
@@ -47,5 +48,21 @@ class VTUTransaction(VTUTransactionBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Row in transaction lists: no provider payload
+class VTUTransactionListItem(BaseModel):
+    id: UUID
+    user_id: UUID
+    service_type: VTUServiceType
+    provider: str
+    recipient: str
+    amount: float
+    reference: Optional[str] = None
+    status: TransactionStatus
+    notes: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
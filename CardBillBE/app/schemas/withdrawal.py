@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator
 
 from app.models.withdrawal import WithdrawalStatus, WithdrawalMethod
 
@@ -11,10 +11,11 @@ class WithdrawalBase(BaseModel):
     method: WithdrawalMethod
     account_details: str
     
-    @validator("account_details")
-    def validate_account_details(cls, v, values):
+    @field_validator("account_details")
+    @classmethod
+    def validate_account_details(cls, v, info: ValidationInfo):
         # Validate based on withdrawal method
-        method = values.get("method")
+        method = info.data.get("method")
         if method == WithdrawalMethod.BANK:
             # Basic check for bank account format
             if len(v.split(",")) < 2:
@@ -51,8 +52,26 @@ class Withdrawal(WithdrawalBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Row in withdrawal lists (projected columns; detail routes return Withdrawal)
+class WithdrawalListItem(BaseModel):
+    id: UUID
+    user_id: UUID
+    amount: float
+    fee: float
+    total: float
+    method: WithdrawalMethod
+    account_details: str
+    status: WithdrawalStatus
+    admin_id: Optional[UUID] = None
+    notes: Optional[str] = None
+    processed_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Admin processing withdrawal
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import run_after_commit
+from app.utils.redis_client import get_redis
+from app.utils.websocket_manager import ws_manager
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "admin:ops-feed"
+# How long one blocking XREAD waits before looping
+BLOCK_MS = 30000
+
+
+def _stream_id(cursor: str) -> Tuple[int, int]:
+    ms, _, seq = cursor.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class AdminFeed:
+    """
+    Ordered log of transaction and withdrawal changes, pushed to admin sockets
+
+    CRUD writes append compact events once their transaction commits: to a
+    capped Redis stream when REDIS_URL is set, otherwise to an in-process
+    ring buffer. Each worker follows the log and, at most every
+    `batch_interval` seconds, sends the new events, coalesced to the latest
+    per record, as one frame to its own admin connections. Every frame
+    carries the cursor of its last event, which a reconnecting dashboard
+    passes back to receive only what it missed.
+    """
+    def __init__(self, batch_interval: float, buffer_size: int):
+        self.batch_interval = batch_interval
+        self.buffer_size = buffer_size
+        self._buffer: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._appended = asyncio.Event()
+        # Last event delivered to this worker's admins; None until the log's tip is known
+        self._last: Optional[str] = None
+        # Held while a batch is read and delivered, so replays can't interleave with it
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.frames = 0
+
+    def record(self, db: AsyncSession, entity: str, action: str, obj: Any):
+        """
+        Append an event for obj once the request's transaction commits
+        """
+        event = {
+            "entity": entity,
+            "action": action,
+            "id": str(obj.id),
+            "user_id": str(obj.user_id),
+            "status": getattr(obj.status, "value", obj.status),
+            "amount": obj.amount,
+            "at": datetime.utcnow().isoformat(),
+        }
+        run_after_commit(db, lambda: self.publish(event))
+
+    async def publish(self, event: Dict[str, Any]):
+        self.published += 1
+        redis = get_redis()
+        if redis is None:
+            self._seq += 1
+            self._buffer.append((self._seq, event))
+            self._appended.set()
+            return
+        try:
+            await redis.xadd(
+                STREAM_KEY, {"event": json.dumps(event)},
+                maxlen=self.buffer_size, approximate=True
+            )
+        except Exception as e:
+            logger.error(f"Admin feed append failed: {str(e)}")
+
+    async def start(self):
+        if self._task is not None:
+            return
+        try:
+            self._last = await self._tip()
+        except Exception as e:
+            # Don't hold up startup; the follower retries until Redis answers
+            logger.warning(f"Admin feed could not read the log tip: {str(e)}")
+        self._task = asyncio.create_task(self._follow())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def replay(self, cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Frame to send a newly connected admin, before any live frame
+
+        Returns the events after `cursor` (None when there are none), or a
+        "reset" frame when the cursor is unknown or older than the retained
+        log, in which case the dashboard should reload its lists. Must be
+        called with the lock held so the frame ends where live delivery
+        resumes.
+        """
+        if not cursor:
+            return None
+        if self._last is None:
+            return {"type": "reset", "cursor": None}
+        try:
+            events, complete = await self._read(cursor, upto=self._last)
+        except ValueError:
+            complete = False
+        if not complete:
+            return {"type": "reset", "cursor": self._last}
+        if not events:
+            return None
+        return self._frame(events)
+
+    async def connect(self, user_id: str, websocket: Any, cursor: Optional[str]):
+        """
+        Register an admin socket and queue its catch-up frame, if any
+        """
+        async with self._lock:
+            frame = await self.replay(cursor)
+            connection = await ws_manager.add_connection(user_id, websocket, is_admin=True)
+            if frame is not None:
+                connection.send(json.dumps(frame))
+        return connection
+
+    async def _follow(self):
+        while True:
+            try:
+                if self._last is None:
+                    self._last = await self._tip()
+                await self._wait()
+                # Let the burst accumulate into one frame
+                await asyncio.sleep(self.batch_interval)
+                async with self._lock:
+                    events, _ = await self._read(self._last)
+                    if events:
+                        self._last = events[-1][0]
+                        if ws_manager.admin_connections:
+                            ws_manager.send_to_local_admins(json.dumps(self._frame(events)))
+                            self.frames += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Admin feed follower failed: {str(e)}")
+                await asyncio.sleep(1)
+
+    def _frame(self, events: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        # Keep only the latest event per record, in the order of that event;
+        # a record created within the batch is still reported as created
+        latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for _, event in events:
+            key = (event["entity"], event["id"])
+            previous = latest.pop(key, None)
+            if previous is not None and previous["action"] == "created":
+                event = {**event, "action": "created"}
+            latest[key] = event
+        return {"type": "ops", "cursor": events[-1][0], "events": list(latest.values())}
+
+    async def _tip(self) -> str:
+        redis = get_redis()
+        if redis is None:
+            return str(self._seq)
+        entries = await redis.xrevrange(STREAM_KEY, count=1)
+        return entries[0][0] if entries else "0-0"
+
+    async def _wait(self):
+        redis = get_redis()
+        if redis is None:
+            if self._seq <= int(self._last):
+                self._appended.clear()
+                await self._appended.wait()
+            return
+        await redis.xread({STREAM_KEY: self._last}, count=1, block=BLOCK_MS)
+
+    async def _read(
+        self, cursor: str, upto: Optional[str] = None
+    ) -> Tuple[List[Tuple[str, Dict[str, Any]]], bool]:
+        """
+        Events after cursor (up to `upto`), and whether none were trimmed away
+        """
+        redis = get_redis()
+        if redis is None:
+            after = int(cursor)
+            limit = int(upto) if upto is not None else self._seq
+            oldest = self._buffer[0][0] if self._buffer else self._seq + 1
+            events = [(str(seq), event) for seq, event in self._buffer if after < seq <= limit]
+            # A cursor from before a restart may be ahead of this buffer
+            return events, oldest - 1 <= after <= self._seq
+
+        _stream_id(cursor)  # reject malformed cursors with ValueError
+        entries = await redis.xrange(
+            STREAM_KEY, min=f"({cursor}", max=upto or "+", count=self.buffer_size
+        )
+        oldest = await redis.xrange(STREAM_KEY, count=1)
+        # A cursor older than the retained log may have missed trimmed events
+        complete = len(entries) < self.buffer_size and (
+            not oldest or _stream_id(cursor) >= _stream_id(oldest[0][0])
+        ) and (upto is None or _stream_id(cursor) <= _stream_id(upto))
+        events = [(entry_id, json.loads(fields["event"])) for entry_id, fields in entries]
+        return events, complete
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cursor": self._last,
+            "published": self.published,
+            "frames": self.frames,
+            "batch_interval": self.batch_interval,
+            "following": self._task is not None,
+        }
+
+
+admin_feed = AdminFeed(
+    batch_interval=settings.ADMIN_FEED_BATCH_MS / 1000,
+    buffer_size=settings.ADMIN_FEED_BUFFER_SIZE,
+)
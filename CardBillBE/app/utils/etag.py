@@ -0,0 +1,50 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+# Authenticated responses: clients may store them but must revalidate
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    ETag for a response determined entirely by `parts`
+
+    Weak, because the same tag is sent with the identity, gzip and brotli
+    bodies, which are semantically equal but not byte-for-byte.
+    """
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header covers etag (weak comparison, per RFC 9110)
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = _opaque(etag)
+    return any(_opaque(candidate) == etag for candidate in if_none_match.split(","))
+
+
+def conditional_get(request: Request, response: Response, *parts: Any) -> Optional[Response]:
+    """
+    Tag the response with an ETag built from parts
+
+    Returns a bodiless 304 response to send instead when the client's copy
+    is current, so the caller can skip building and serializing the body.
+    """
+    etag = make_etag(*parts)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
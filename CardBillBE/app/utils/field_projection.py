@@ -0,0 +1,73 @@
+import functools
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel, TypeAdapter, create_model
+
+
+def field_selection(schema: Type[BaseModel]) -> Callable:
+    """
+    Dependency parsing a `fields=a,b,c` query parameter against a list schema
+
+    Accepts field names or their aliases and resolves to field names in
+    schema order, or None when the parameter is absent (all fields).
+    `id` is always included.
+    """
+    lookup: Dict[str, str] = {}
+    for name, field in schema.model_fields.items():
+        lookup[name] = name
+        if field.alias:
+            lookup[field.alias] = name
+
+    async def dependency(
+        fields: Optional[str] = Query(
+            None, description="Comma-separated fields to return (default: all)"
+        )
+    ) -> Optional[Tuple[str, ...]]:
+        if not fields:
+            return None
+        requested = {"id"}
+        for raw in fields.split(","):
+            name = raw.strip()
+            if not name:
+                continue
+            if name not in lookup:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown field '{name}'"
+                )
+            requested.add(lookup[name])
+        return tuple(name for name in schema.model_fields if name in requested)
+
+    return dependency
+
+
+@functools.lru_cache(maxsize=256)
+def _projected_adapter(schema: Type[BaseModel], fields: Tuple[str, ...]) -> TypeAdapter:
+    projected = create_model(
+        f"{schema.__name__}Projection",
+        __config__=schema.model_config,
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields},
+    )
+    return TypeAdapter(List[projected])
+
+
+def projected_response(
+    response: Response, items: Sequence[Any], schema: Type[BaseModel], fields: Tuple[str, ...]
+) -> Response:
+    """
+    Serialize rows with only the selected fields of schema
+
+    Returned as a raw Response because the route's response_model requires
+    every field; headers already set on `response` (e.g. the next cursor)
+    are carried over.
+    """
+    adapter = _projected_adapter(schema, fields)
+    body = adapter.dump_json(
+        adapter.validate_python(items, from_attributes=True), by_alias=True
+    )
+    headers = {
+        name: value for name, value in response.headers.items()
+        if name != "content-length"
+    }
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,79 @@
+import json
+import logging
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.utils.pubsub import get_pubsub
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache-invalidation"
+
+# Called with the entity id and version from the event; (None, None) means
+# events may have been missed and the whole cache should be dropped
+InvalidationHandler = Callable[[Optional[str], Optional[int]], Awaitable[None]]
+
+
+class InvalidationBus:
+    """
+    Broadcasts (entity, id, version) cache invalidation events to every worker
+
+    Caches register a handler per entity at import time. publish() runs the
+    local handlers immediately and then fans the event out to the other
+    workers, which skip their own echoes by origin.
+    """
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[InvalidationHandler]] = defaultdict(list)
+        self.published = 0
+        self.received = 0
+
+    def subscribe(self, entity: str, handler: InvalidationHandler):
+        self._handlers[entity].append(handler)
+
+    async def start(self):
+        pubsub = get_pubsub()
+        await pubsub.subscribe(CHANNEL, self._on_message)
+        pubsub.on_resubscribe(self._flush_all)
+
+    async def publish(self, entity: str, id: Any = None, version: Optional[int] = None):
+        id = None if id is None else str(id)
+        await self._run_handlers(entity, id, version)
+        self.published += 1
+        await get_pubsub().publish(CHANNEL, json.dumps({
+            "entity": entity, "id": id, "version": version, "origin": self.origin,
+        }))
+
+    async def _on_message(self, raw: str):
+        try:
+            event = json.loads(raw)
+        except ValueError:
+            logger.warning(f"Ignoring malformed invalidation event: {raw!r}")
+            return
+        if event.get("origin") == self.origin:
+            return
+        self.received += 1
+        await self._run_handlers(event.get("entity"), event.get("id"), event.get("version"))
+
+    async def _flush_all(self):
+        for entity in list(self._handlers):
+            await self._run_handlers(entity, None, None)
+
+    async def _run_handlers(self, entity: str, id: Optional[str], version: Optional[int]):
+        for handler in self._handlers.get(entity, []):
+            try:
+                await handler(id, version)
+            except Exception as e:
+                logger.error(f"Invalidation handler for {entity} failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "origin": self.origin,
+            "entities": sorted(self._handlers),
+            "published": self.published,
+            "received": self.received,
+        }
+
+
+invalidation_bus = InvalidationBus()
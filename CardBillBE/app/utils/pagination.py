@@ -0,0 +1,107 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Cursor(NamedTuple):
+    """
+    Position of the last row of a page, ordered by (created_at, id)
+    (or any other timestamp/UUID pair)
+    """
+    created_at: datetime
+    id: UUID
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """
+    Encode a (created_at, id) position as an opaque URL-safe string
+    """
+    raw = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decode a cursor produced by encode_cursor
+    Raises ValueError if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return Cursor(datetime.fromisoformat(created_at), UUID(id))
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def get_cursor(cursor: Optional[str] = None) -> Optional[Cursor]:
+    """
+    Dependency that decodes the optional `cursor` query parameter
+    """
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def apply_cursor(
+    query: Select, created_at_column: Any, id_column: Any,
+    cursor: Optional[Cursor], descending: bool = True
+) -> Select:
+    """
+    Restrict a query to rows after the cursor and order it by (created_at, id)
+    """
+    if descending:
+        if cursor:
+            query = query.where(
+                tuple_(created_at_column, id_column) < tuple_(cursor.created_at, cursor.id)
+            )
+        return query.order_by(created_at_column.desc(), id_column.desc())
+
+    if cursor:
+        query = query.where(
+            tuple_(created_at_column, id_column) > tuple_(cursor.created_at, cursor.id)
+        )
+    return query.order_by(created_at_column.asc(), id_column.asc())
+
+
+def _created_at_and_id(row: Any) -> Tuple[datetime, UUID]:
+    return row.created_at, row.id
+
+
+def next_cursor(
+    rows: Sequence[Any], limit: int,
+    key: Callable[[Any], Tuple[datetime, UUID]] = _created_at_and_id
+) -> Optional[str]:
+    """
+    Cursor for the page after `rows`, or None if this was the last page
+    `key` returns the (timestamp, id) pair the rows are ordered by
+    """
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor(*key(rows[-1]))
+
+
+def set_next_cursor(
+    response: Response, rows: Sequence[Any], limit: int,
+    key: Callable[[Any], Tuple[datetime, UUID]] = _created_at_and_id
+) -> None:
+    """
+    Attach the next-page cursor header to the response when there is one
+    """
+    cursor = next_cursor(rows, limit, key)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+WORKERS_KEY = "ws:presence:workers"
+WORKER_KEY_PREFIX = "ws:presence:"
+LAST_SEEN_KEY = "ws:last-seen"
+
+
+class Presence:
+    """
+    Which users have a live WebSocket on any worker, and when each was last seen
+
+    Each worker keeps its online users in its own Redis hash (user id ->
+    last seen), rewritten every `heartbeat` seconds with a `ttl`; a worker
+    that dies simply stops refreshing and its users age out. Live workers
+    are listed in a sorted set scored by heartbeat time. Users going
+    offline are recorded in a shared last-seen hash. Without Redis this is
+    process-local, and last-seen times are kept for `last_seen_ttl` seconds.
+    """
+    def __init__(self, ttl: int, heartbeat: int, last_seen_ttl: int):
+        self.origin = uuid.uuid4().hex
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self.last_seen_ttl = last_seen_ttl
+        # Users with a connection on this worker -> last seen
+        self._local: Dict[str, float] = {}
+        # Offline users -> last seen, when Redis is not configured; in
+        # insertion order, which is disconnect order
+        self._last_seen: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def _worker_key(self) -> str:
+        return WORKER_KEY_PREFIX + self.origin
+
+    async def start(self):
+        if self._task is None and get_redis() is not None:
+            self._task = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        redis = get_redis()
+        if redis is not None:
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.delete(self._worker_key)
+                    pipe.zrem(WORKERS_KEY, self.origin)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Presence cleanup failed: {str(e)}")
+
+    async def connected(self, user_id: str):
+        now = time.time()
+        self._local[user_id] = now
+        self._last_seen.pop(user_id, None)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.hset(self._worker_key, user_id, now)
+                    pipe.expire(self._worker_key, self.ttl)
+                    pipe.zadd(WORKERS_KEY, {self.origin: now})
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Presence write failed: {str(e)}")
+
+    def touch(self, user_id: str):
+        """
+        Note activity from a connected user; published with the next heartbeat
+        """
+        if user_id in self._local:
+            self._local[user_id] = time.time()
+
+    async def disconnected(self, user_id: str):
+        """
+        Called when the user's last connection on this worker closes
+        """
+        self._local.pop(user_id, None)
+        now = time.time()
+        redis = get_redis()
+        if redis is None:
+            self._last_seen[user_id] = now
+            self._prune_last_seen(now)
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hdel(self._worker_key, user_id)
+                pipe.hset(LAST_SEEN_KEY, user_id, now)
+                pipe.expire(LAST_SEEN_KEY, self.last_seen_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Presence write failed: {str(e)}")
+
+    async def online(self) -> Dict[str, float]:
+        """
+        Online users on every live worker, with their latest last-seen time
+        """
+        redis = get_redis()
+        if redis is None:
+            return dict(self._local)
+        try:
+            workers = await redis.zrangebyscore(WORKERS_KEY, time.time() - self.ttl, "+inf")
+            async with redis.pipeline(transaction=False) as pipe:
+                for origin in workers:
+                    pipe.hgetall(WORKER_KEY_PREFIX + origin)
+                hashes = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Presence read failed: {str(e)}")
+            return dict(self._local)
+        online: Dict[str, float] = {}
+        for users in hashes:
+            for user_id, seen in users.items():
+                online[user_id] = max(online.get(user_id, 0.0), float(seen))
+        return online
+
+    async def last_seen(self, user_ids: Iterable[str]) -> Dict[str, float]:
+        """
+        Last time each of user_ids was connected, for those ever seen offline
+        """
+        user_ids = list(user_ids)
+        redis = get_redis()
+        if redis is None:
+            self._prune_last_seen(time.time())
+            return {u: self._last_seen[u] for u in user_ids if u in self._last_seen}
+        if not user_ids:
+            return {}
+        try:
+            values = await redis.hmget(LAST_SEEN_KEY, user_ids)
+        except Exception as e:
+            logger.warning(f"Presence read failed: {str(e)}")
+            return {}
+        return {u: float(v) for u, v in zip(user_ids, values) if v is not None}
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            try:
+                await self._publish()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Presence heartbeat failed: {str(e)}")
+
+    def _prune_last_seen(self, now: float):
+        cutoff = now - self.last_seen_ttl
+        while self._last_seen:
+            user_id, seen = next(iter(self._last_seen.items()))
+            if seen >= cutoff:
+                break
+            del self._last_seen[user_id]
+
+    async def _publish(self):
+        now = time.time()
+        redis = get_redis()
+        # Replace the hash outright so users whose HDEL failed or raced this
+        # heartbeat don't linger
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._worker_key)
+            if self._local:
+                pipe.hset(self._worker_key, mapping=dict(self._local))
+                pipe.expire(self._worker_key, self.ttl)
+            pipe.zadd(WORKERS_KEY, {self.origin: now})
+            pipe.zremrangebyscore(WORKERS_KEY, "-inf", now - self.ttl)
+            await pipe.execute()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "origin": self.origin,
+            "local_users": len(self._local),
+            "heartbeat": self.heartbeat if self._task is not None else None,
+        }
+
+
+presence = Presence(
+    ttl=settings.PRESENCE_TTL,
+    heartbeat=settings.PRESENCE_HEARTBEAT_INTERVAL,
+    last_seen_ttl=settings.PRESENCE_LAST_SEEN_TTL,
+)
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str], Awaitable[None]]
+ResubscribeHandler = Callable[[], Awaitable[None]]
+
+
+class LocalPubSub:
+    """
+    In-process stand-in for Redis pub/sub
+
+    Delivers to handlers in this process only; used when REDIS_URL is not
+    configured, and by tests and benchmarks.
+    """
+    def __init__(self):
+        self._handlers: Dict[str, List[MessageHandler]] = defaultdict(list)
+        self._resubscribe_handlers: List[ResubscribeHandler] = []
+
+    async def publish(self, channel: str, message: str):
+        await _dispatch(self._handlers.get(channel, []), channel, message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        self._handlers[channel].append(handler)
+
+    async def unsubscribe(self, channel: str, handler: MessageHandler):
+        handlers = self._handlers.get(channel)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del self._handlers[channel]
+
+    def on_resubscribe(self, handler: ResubscribeHandler):
+        self._resubscribe_handlers.append(handler)
+
+    async def stop(self):
+        self._handlers.clear()
+
+
+class RedisPubSub:
+    """
+    Pub/sub across workers over Redis
+
+    A single listener task per process fans messages out to the handlers
+    registered for each channel. When the connection drops the listener
+    resubscribes and calls the on_resubscribe handlers, since anything
+    published in the meantime was lost. While no channel is subscribed
+    the listener sleeps until the next subscribe.
+    """
+    def __init__(self, redis):
+        self._redis = redis
+        self._handlers: Dict[str, List[MessageHandler]] = defaultdict(list)
+        self._resubscribe_handlers: List[ResubscribeHandler] = []
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        # Set while at least one channel is subscribed
+        self._has_channels: Optional[asyncio.Event] = None
+
+    async def publish(self, channel: str, message: str):
+        try:
+            await self._redis.publish(channel, message)
+        except Exception as e:
+            logger.error(f"Redis publish to {channel} failed: {str(e)}")
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        self._handlers[channel].append(handler)
+        if self._pubsub is None:
+            self._pubsub = self._redis.pubsub()
+        if self._has_channels is None:
+            self._has_channels = asyncio.Event()
+        await self._pubsub.subscribe(channel)
+        self._has_channels.set()
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def unsubscribe(self, channel: str, handler: MessageHandler):
+        handlers = self._handlers.get(channel)
+        if not handlers or handler not in handlers:
+            return
+        handlers.remove(handler)
+        if handlers:
+            return
+        del self._handlers[channel]
+        if not self._handlers:
+            self._has_channels.clear()
+        try:
+            await self._pubsub.unsubscribe(channel)
+        except Exception as e:
+            logger.error(f"Redis unsubscribe from {channel} failed: {str(e)}")
+
+    def on_resubscribe(self, handler: ResubscribeHandler):
+        self._resubscribe_handlers.append(handler)
+
+    async def _listen(self):
+        while True:
+            await self._has_channels.wait()
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    channel = message["channel"]
+                    await _dispatch(self._handlers.get(channel, []), channel, message["data"])
+                # listen() returns once the last channel is unsubscribed
+                if not self._handlers:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis pub/sub listener failed: {str(e)}")
+            await asyncio.sleep(1)
+            await self._resubscribe()
+
+    async def _resubscribe(self):
+        old, self._pubsub = self._pubsub, self._redis.pubsub()
+        try:
+            await old.reset()
+        except Exception:
+            pass
+        if not self._handlers:
+            # Nothing to restore, and SUBSCRIBE needs at least one channel
+            self._has_channels.clear()
+            return
+        try:
+            await self._pubsub.subscribe(*self._handlers)
+        except Exception as e:
+            logger.error(f"Redis pub/sub resubscribe failed: {str(e)}")
+            return
+        for handler in self._resubscribe_handlers:
+            try:
+                await handler()
+            except Exception as e:
+                logger.error(f"Pub/sub resubscribe handler failed: {str(e)}")
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.reset()
+            self._pubsub = None
+
+
+async def _dispatch(handlers: List[MessageHandler], channel: str, message: str):
+    for handler in list(handlers):
+        try:
+            await handler(message)
+        except Exception as e:
+            logger.error(f"Pub/sub handler for {channel} failed: {str(e)}")
+
+
+_pubsub = None
+
+
+def get_pubsub():
+    """
+    Shared pub/sub transport: Redis when configured, otherwise in-process
+    """
+    global _pubsub
+    if _pubsub is None:
+        redis = get_redis()
+        _pubsub = RedisPubSub(redis) if redis is not None else LocalPubSub()
+    return _pubsub
@@ -0,0 +1,69 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.query_stats import QueryStats, current_query_stats, route_query_summary
+
+logger = logging.getLogger(__name__)
+
+
+def route_name(scope: Scope) -> str:
+    """
+    Low-cardinality name for the route that handled the request
+    """
+    method = scope.get("method", "")
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return f"{method} {route.path}"
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return f"{method} {endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__name__}"
+    return f"{method} <unmatched>"
+
+
+class QueryStatsMiddleware:
+    """
+    Count SQL statements and DB time per request
+
+    Adds a Server-Timing header, feeds the per-route rolling summary and
+    warns when a request exceeds the statement budget or repeats the same
+    statement shape too often (a likely N+1).
+    """
+    def __init__(self, app: ASGIApp, statement_budget: int, repeat_threshold: int):
+        self.app = app
+        self.statement_budget = statement_budget
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            route = route_name(scope)
+            route_query_summary.record(route, stats)
+            self._check_budget(route, stats)
+
+    def _check_budget(self, route: str, stats: QueryStats):
+        if stats.count > self.statement_budget:
+            logger.warning(
+                f"{route} executed {stats.count} SQL statements "
+                f"(budget {self.statement_budget}, {stats.total_ms:.1f} ms)"
+            )
+        repeated = stats.most_repeated()
+        if repeated and repeated[1] >= self.repeat_threshold:
+            shape, count = repeated
+            logger.warning(f"{route} repeated a statement {count} times, possible N+1: {shape[:200]}")
@@ -0,0 +1,26 @@
+import logging
+from typing import Optional
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is optional; everything falls back to in-process state
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+_client: Optional["aioredis.Redis"] = None
+
+
+def get_redis() -> Optional["aioredis.Redis"]:
+    """
+    Shared Redis client, or None when REDIS_URL is not configured
+    """
+    global _client
+    if _client is None and settings.REDIS_URL:
+        if aioredis is None:
+            logger.warning("REDIS_URL is set but the redis package is not installed")
+            return None
+        _client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
@@ -0,0 +1,123 @@
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Sequence, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+from app.utils.compression import negotiate, precompress
+from app.utils.etag import etag_matches
+from app.utils.invalidation_bus import invalidation_bus
+
+# Headers set by the endpoint that are replayed with a cached body
+REPLAYED_HEADERS = ("etag", "cache-control")
+
+
+def _encoded_response(request: Request, bodies: Dict[str, bytes], headers: Dict[str, str]) -> Response:
+    """
+    The stored body in the best encoding the client accepts
+    """
+    if len(bodies) == 1:
+        return Response(content=bodies["identity"], media_type="application/json", headers=headers)
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    if encoding in bodies:
+        headers["Content-Encoding"] = encoding
+        return Response(content=bodies[encoding], media_type="application/json", headers=headers)
+    return Response(content=bodies["identity"], media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """
+    Final encoded response bodies keyed by route, query shape and generation
+
+    The generation is bumped by invalidation events for `entities`, so a
+    write on any worker retires every cached body at once. Entries also
+    expire after `ttl` seconds as a backstop for lost events. Bodies are
+    compressed once when stored, so hits skip the compression middleware.
+    """
+    def __init__(self, name: str, entities: Sequence[str], maxsize: int, ttl: int):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict[str, bytes], Dict[str, str]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        for entity in entities:
+            invalidation_bus.subscribe(entity, self._on_invalidated)
+
+    async def _on_invalidated(self, id: Any, version: Any):
+        self.generation += 1
+        self._entries.clear()
+
+    def cached(self, *key_params: str) -> Callable:
+        """
+        Decorator for a GET endpoint whose body depends only on `key_params`
+
+        The endpoint must accept `request` and `response` parameters; headers
+        it sets on `response` (ETag, Cache-Control) are stored with the body.
+        Endpoints may still return a Response (e.g. a 304), which is passed
+        through uncached.
+        """
+        def decorator(endpoint: Callable) -> Callable:
+            @functools.wraps(endpoint)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                key = (
+                    endpoint.__qualname__, self.generation,
+                    tuple(kwargs[name] for name in key_params),
+                )
+                entry = self._lookup(key)
+                if entry is not None:
+                    bodies, headers = entry
+                    if etag_matches(kwargs["request"].headers.get("if-none-match"), headers.get("etag", "")):
+                        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+                    return _encoded_response(kwargs["request"], bodies, headers)
+
+                result = await endpoint(*args, **kwargs)
+                if isinstance(result, Response):
+                    return result
+                body = ORJSONResponse(content=jsonable_encoder(result)).body
+                headers = {
+                    name: value for name, value in kwargs["response"].headers.items()
+                    if name in REPLAYED_HEADERS
+                }
+                bodies = precompress(body)
+                self._store(key, bodies, headers)
+                return _encoded_response(kwargs["request"], bodies, headers)
+            return wrapper
+        return decorator
+
+    def _lookup(self, key: Tuple):
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, bodies, headers = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return bodies, headers
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def _store(self, key: Tuple, bodies: Dict[str, bytes], headers: Dict[str, str]):
+        # A generation bump while the endpoint ran makes this key unreachable
+        if key[1] != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, bodies, headers)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "generation": self.generation,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
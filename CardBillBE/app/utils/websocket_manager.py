@@ -1,62 +1,284 @@
-from typing import Dict, List, Any
-from fastapi import WebSocket
+from typing import Dict, Any, Optional, Set
+from fastapi import WebSocket, status
+import asyncio
 import json
 import logging
+import time
+
+from app.core.config import settings
+from app.utils.presence import presence
+from app.utils.pubsub import MessageHandler, get_pubsub
 
 logger = logging.getLogger(__name__)
 
+USER_CHANNEL_PREFIX = "ws:user:"
+ADMIN_CHANNEL = "ws:admins"
+BROADCAST_CHANNEL = "ws:broadcast"
+
+# Application-level heartbeat; clients answer with any frame (e.g. {"type": "pong"})
+PING_MESSAGE = json.dumps({"type": "ping"})
+PONG_MESSAGE = json.dumps({"type": "pong"})
+# Upper bound on a close handshake with an unresponsive peer
+CLOSE_TIMEOUT = 5
+
+
+class Connection:
+    """
+    One WebSocket with a bounded outbound queue drained by its own writer task
+
+    All writes to the socket go through send(), so a slow client only
+    backs up its own queue and never the sender.
+    """
+    def __init__(self, user_id: str, websocket: WebSocket, queue_size: int):
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+        self.last_received = time.monotonic()
+        self._writer = asyncio.create_task(self._write())
+
+    def touch(self):
+        """
+        Record a frame from the client; any frame counts as a heartbeat reply
+        """
+        self.last_received = time.monotonic()
+
+    def send(self, text: str) -> bool:
+        """
+        Queue text without waiting; False if the queue is full or the socket is gone
+        """
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def _write(self):
+        try:
+            while True:
+                text = await self.queue.get()
+                await self.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The receive loop sees the disconnect and removes the connection
+            self.closed = True
+            logger.info(f"WebSocket writer for user {self.user_id} stopped: {str(e)}")
+
+    def stop(self):
+        self.closed = True
+        self._writer.cancel()
+
+    async def close(self, code: int):
+        self.stop()
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), CLOSE_TIMEOUT)
+        except Exception:
+            pass
+
 
 class WebSocketManager:
     """
-    Manager for WebSocket connections
+    Manager for WebSocket connections, shared by every router in the process
+
+    Sends go through pub/sub: one channel per user, one for admins and one
+    for broadcasts. A worker subscribes to a user's channel while it holds
+    that user's socket, so a message published on any worker reaches the
+    socket wherever it is connected. A user may have several connections
+    (one per device), and all of them receive the user's messages.
+    Payloads are encoded once by the sender and queued on each recipient's
+    Connection as-is; a connection whose queue overflows is closed rather
+    than allowed to hold up delivery.
+
+    One reaper task per process pings every connection each `ping_interval`
+    seconds and closes those that sent nothing for `idle_timeout` seconds
+    or whose writer died, so half-open sockets don't accumulate.
     """
-    def __init__(self):
-        # User ID to WebSocket mapping
-        self.active_connections: Dict[str, WebSocket] = {}
-        # List of admin user IDs
-        self.admin_connections: List[str] = []
-        
-    def add_connection(self, user_id: str, websocket: WebSocket, is_admin: bool = False):
+    def __init__(
+        self, pubsub=None, queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        ping_interval: int = settings.WS_PING_INTERVAL,
+        idle_timeout: int = settings.WS_IDLE_TIMEOUT,
+    ):
+        # Injected in tests and benchmarks (e.g. a LocalPubSub); otherwise the shared transport
+        self._pubsub = pubsub
+        self.queue_size = queue_size
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self._reaper: Optional[asyncio.Task] = None
+        self.reaped = 0
+        # User ID to that user's connections on this worker
+        self.active_connections: Dict[str, Set[Connection]] = {}
+        # IDs of admin users connected to this worker
+        self.admin_connections: Set[str] = set()
+        self._user_handlers: Dict[str, MessageHandler] = {}
+        self._broadcast_subscribed = False
+        self._evictions: Set[asyncio.Task] = set()
+        self.evicted = 0
+
+    @property
+    def pubsub(self):
+        return self._pubsub if self._pubsub is not None else get_pubsub()
+
+    async def add_connection(self, user_id: str, websocket: WebSocket, is_admin: bool = False) -> Connection:
         """
         Add a new WebSocket connection
+
+        Returns the Connection; the endpoint must write to the socket through
+        it so its own replies are ordered with pushed messages.
         """
-        self.active_connections[user_id] = websocket
-        if is_admin:
-            self.admin_connections.append(user_id)
+        connection = Connection(user_id, websocket, self.queue_size)
+        connections = self.active_connections.get(user_id)
+        if connections is None:
+            connections = self.active_connections[user_id] = set()
+        connections.add(connection)
+        if user_id not in self._user_handlers:
+            handler = self._user_handler(user_id)
+            self._user_handlers[user_id] = handler
+            await self.pubsub.subscribe(USER_CHANNEL_PREFIX + user_id, handler)
+            await presence.connected(user_id)
+        if is_admin and user_id not in self.admin_connections:
+            if not self.admin_connections:
+                await self.pubsub.subscribe(ADMIN_CHANNEL, self._on_admin_message)
+            self.admin_connections.add(user_id)
+        if not self._broadcast_subscribed:
+            self._broadcast_subscribed = True
+            await self.pubsub.subscribe(BROADCAST_CHANNEL, self._on_broadcast_message)
         logger.info(f"WebSocket connection added for user {user_id}")
-        
-    def remove_connection(self, user_id: str):
+        return connection
+
+    async def remove_connection(self, user_id: str, websocket: WebSocket):
         """
-        Remove a WebSocket connection
+        Remove one WebSocket connection of a user
+
+        The user's channel subscription and presence are dropped with their
+        last connection on this worker.
         """
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
-        if user_id in self.admin_connections:
-            self.admin_connections.remove(user_id)
+        connections = self.active_connections.get(user_id)
+        if not connections:
+            return
+        connection = next((c for c in connections if c.websocket is websocket), None)
+        if connection is None:
+            return
+        connections.discard(connection)
+        connection.stop()
         logger.info(f"WebSocket connection removed for user {user_id}")
-    
+        if connections:
+            return
+
+        del self.active_connections[user_id]
+        handler = self._user_handlers.pop(user_id, None)
+        if handler is not None:
+            await self.pubsub.unsubscribe(USER_CHANNEL_PREFIX + user_id, handler)
+        await presence.disconnected(user_id)
+        if user_id in self.admin_connections:
+            self.admin_connections.discard(user_id)
+            if not self.admin_connections:
+                await self.pubsub.unsubscribe(ADMIN_CHANNEL, self._on_admin_message)
+
     async def send_to_user(self, user_id: str, message: Any):
         """
-        Send a message to a specific user
+        Send a message to a specific user, on whichever worker they are connected
         """
-        if user_id in self.active_connections:
-            websocket = self.active_connections[user_id]
-            await websocket.send_text(json.dumps(message))
-            logger.info(f"Message sent to user {user_id}")
-            
+        await self.pubsub.publish(USER_CHANNEL_PREFIX + str(user_id), json.dumps(message))
+
     async def broadcast(self, message: Any):
         """
         Broadcast a message to all connected clients
         """
-        for user_id, websocket in self.active_connections.items():
-            await websocket.send_text(json.dumps(message))
-        logger.info(f"Message broadcasted to {len(self.active_connections)} users")
-            
+        await self.pubsub.publish(BROADCAST_CHANNEL, json.dumps(message))
+
     async def broadcast_to_admins(self, message: Any):
         """
         Broadcast a message to all connected admin clients
         """
+        await self.pubsub.publish(ADMIN_CHANNEL, json.dumps(message))
+
+    def _user_handler(self, user_id: str) -> MessageHandler:
+        async def deliver(text: str):
+            for connection in self.active_connections.get(user_id, ()):
+                self._deliver(connection, text)
+        return deliver
+
+    def send_to_local_admins(self, text: str):
+        """
+        Queue pre-encoded text on every admin connection held by this worker
+        """
         for user_id in self.admin_connections:
-            if user_id in self.active_connections:
-                await self.active_connections[user_id].send_text(json.dumps(message))
-        logger.info(f"Message broadcasted to {len(self.admin_connections)} admins")
\ No newline at end of file
+            for connection in self.active_connections.get(user_id, ()):
+                self._deliver(connection, text)
+
+    async def _on_admin_message(self, text: str):
+        self.send_to_local_admins(text)
+
+    async def _on_broadcast_message(self, text: str):
+        for connections in self.active_connections.values():
+            for connection in connections:
+                self._deliver(connection, text)
+
+    def _deliver(self, connection: Connection, text: str):
+        if connection.send(text) or connection.closed:
+            return
+        # Queue full: the client can't keep up, so drop it and let it reconnect
+        logger.warning(f"Evicting slow WebSocket consumer for user {connection.user_id}")
+        self.evicted += 1
+        self._close_in_background(connection, status.WS_1013_TRY_AGAIN_LATER)
+
+    def _close_in_background(self, connection: Connection, code: int):
+        connection.stop()
+        task = asyncio.create_task(self._evict(connection, code))
+        self._evictions.add(task)
+        task.add_done_callback(self._evictions.discard)
+
+    async def _evict(self, connection: Connection, code: int):
+        await connection.close(code)
+        await self.remove_connection(connection.user_id, connection.websocket)
+
+    def start_reaper(self):
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_loop())
+
+    def stop_reaper(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"WebSocket reaper failed: {str(e)}")
+
+    def reap(self):
+        """
+        Close idle or dead connections and ping the rest
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
+                if connection.closed or connection.last_received < deadline:
+                    logger.info(f"Reaping idle WebSocket for user {connection.user_id}")
+                    self.reaped += 1
+                    self._close_in_background(connection, status.WS_1001_GOING_AWAY)
+                else:
+                    self._deliver(connection, PING_MESSAGE)
+
+    def stats(self) -> Dict[str, Any]:
+        connections = [c for cs in self.active_connections.values() for c in cs]
+        return {
+            "users": len(self.active_connections),
+            "connections": len(connections),
+            "admins": len(self.admin_connections),
+            "queued": sum(c.queue.qsize() for c in connections),
+            "queue_size": self.queue_size,
+            "evicted": self.evicted,
+            "reaped": self.reaped,
+        }
+
+
+# The process-wide manager; routers must share it so sockets accepted by one
+# are reachable from sends in another
+ws_manager = WebSocketManager()
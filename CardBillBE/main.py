@@ -1,10 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.core.config import settings
 from app.api.api_v1.api import api_router
-from app.db.init_db import  init_db
+from app.utils.admin_feed import admin_feed
+from app.utils.compression import CompressionMiddleware
+from app.utils.invalidation_bus import invalidation_bus
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.presence import presence
+from app.utils.pubsub import get_pubsub
+from app.utils.query_stats_middleware import QueryStatsMiddleware
+from app.utils.websocket_manager import ws_manager
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -12,6 +19,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Set up CORS
@@ -26,19 +34,53 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods (GET, POST, OPTIONS, etc.)
     allow_headers=["*"],  # Allow all headers
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],  # Let browsers read pagination cursors and ETags
 )
 
+# Per-request SQL statement counting (Server-Timing header + N+1 warnings)
+app.add_middleware(
+    QueryStatsMiddleware,
+    statement_budget=settings.SQL_STATEMENT_BUDGET,
+    repeat_threshold=settings.SQL_REPEATED_STATEMENT_THRESHOLD,
+)
+
+# gzip/brotli for large JSON bodies; outermost so it sees the final response
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
 # Include all API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+
 @app.on_event("startup")
-async def startup_event():
-    """
-    Initialize application on startup
-    """
-    # Create first admin user if doesn't exist
-    await init_db()
-    # await create_first_admin()
+async def start_invalidation_bus():
+    # Evict in-process caches when another worker writes
+    await invalidation_bus.start()
+
+
+@app.on_event("startup")
+async def start_presence_heartbeat():
+    # Keep this worker's online users visible to the others
+    await presence.start()
+
+
+@app.on_event("startup")
+async def start_websocket_reaper():
+    # Ping chat sockets and close the ones that stopped answering
+    ws_manager.start_reaper()
+
+
+@app.on_event("startup")
+async def start_admin_feed():
+    # Follow the operations log and push batches to this worker's admins
+    await admin_feed.start()
+
+
+@app.on_event("shutdown")
+async def stop_pubsub():
+    ws_manager.stop_reaper()
+    await admin_feed.stop()
+    await presence.stop()
+    await get_pubsub().stop()
 
 @app.get("/", tags=["Health Check"])
 async def root():
@@ -0,0 +1,212 @@
+"""Initial schema, as previously created by Base.metadata.create_all
+
+Databases that were bootstrapped by the old startup create_all already
+match this revision and should be marked with `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# Enum types store member names, matching SQLAlchemy's Enum(PythonEnum) default
+crypto_type = postgresql.ENUM(
+    "BTC", "ETH", "USDT", "BNB", "SOL", "XRP", name="cryptotype", create_type=False
+)
+transaction_type = postgresql.ENUM("BUY", "SELL", name="transactiontype", create_type=False)
+transaction_status = postgresql.ENUM(
+    "PENDING", "COMPLETED", "FAILED", "CANCELLED", name="transactionstatus", create_type=False
+)
+gift_card_type = postgresql.ENUM(
+    "AMAZON", "APPLE", "GOOGLE_PLAY", "STEAM", "PLAYSTATION", "XBOX", "NETFLIX", "SPOTIFY", "OTHER",
+    name="giftcardtype", create_type=False
+)
+vtu_service_type = postgresql.ENUM(
+    "AIRTIME", "DATA", "ELECTRICITY", "CABLE", "WATER", "INTERNET",
+    name="vtuservicetype", create_type=False
+)
+withdrawal_status = postgresql.ENUM(
+    "PENDING", "APPROVED", "REJECTED", "COMPLETED", name="withdrawalstatus", create_type=False
+)
+withdrawal_method = postgresql.ENUM(
+    "BANK", "CRYPTO", "MOBILE_MONEY", name="withdrawalmethod", create_type=False
+)
+
+ENUMS = [
+    crypto_type, transaction_type, transaction_status, gift_card_type,
+    vtu_service_type, withdrawal_status, withdrawal_method,
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for enum_type in ENUMS:
+        enum_type.create(bind, checkfirst=True)
+
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False, unique=True),
+        sa.Column("password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String()),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_verified", sa.Boolean()),
+        sa.Column("is_admin", sa.Boolean()),
+        sa.Column("balance", sa.Float()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("verification_code", sa.String()),
+        sa.Column("reset_code", sa.String()),
+        sa.Column("reset_code_expires", sa.DateTime()),
+        sa.Column("profile_picture", sa.String()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_full_name", "users", ["full_name"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "crypto",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("symbol", sa.String(10), nullable=False),
+        sa.Column("buy_rate", sa.Float(), nullable=False),
+        sa.Column("sell_rate", sa.Float(), nullable=False),
+        sa.Column("logo_url", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_crypto_id", "crypto", ["id"])
+    op.create_index("ix_crypto_symbol", "crypto", ["symbol"])
+
+    op.create_table(
+        "cryptotransaction",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("crypto_type", crypto_type, nullable=False),
+        sa.Column("transaction_type", transaction_type, nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("transaction_hash", sa.String()),
+        sa.Column("wallet_address", sa.String()),
+        sa.Column("status", transaction_status),
+        sa.Column("admin_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_cryptotransaction_id", "cryptotransaction", ["id"])
+    op.create_index("ix_cryptotransaction_user_id", "cryptotransaction", ["user_id"])
+
+    op.create_table(
+        "giftcard",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("type", gift_card_type, nullable=False),
+        sa.Column("buy_rate", sa.Float(), nullable=False),
+        sa.Column("sell_rate", sa.Float(), nullable=False),
+        sa.Column("icon_url", sa.String()),
+        sa.Column("denominations", postgresql.JSONB(), nullable=False),
+        sa.Column("countries", postgresql.JSONB(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_giftcard_id", "giftcard", ["id"])
+    op.create_index("ix_giftcard_type", "giftcard", ["type"])
+
+    op.create_table(
+        "giftcardtransaction",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("gift_card_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("giftcard.id"), nullable=False),
+        sa.Column("transaction_type", transaction_type, nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("card_code", sa.String(), nullable=False),
+        sa.Column("card_pin", sa.String(), nullable=False),
+        sa.Column("card_image_url", sa.String()),
+        sa.Column("status", transaction_status, nullable=False),
+        sa.Column("admin_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("notes", sa.Text()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_giftcardtransaction_id", "giftcardtransaction", ["id"])
+    op.create_index("ix_giftcardtransaction_user_id", "giftcardtransaction", ["user_id"])
+
+    op.create_table(
+        "withdrawal",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("fee", sa.Float()),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("method", withdrawal_method, nullable=False),
+        sa.Column("account_details", sa.String(), nullable=False),
+        sa.Column("status", withdrawal_status),
+        sa.Column("admin_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("notes", sa.Text()),
+        sa.Column("processed_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_withdrawal_id", "withdrawal", ["id"])
+    op.create_index("ix_withdrawal_user_id", "withdrawal", ["user_id"])
+
+    op.create_table(
+        "chat_message",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("admin_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("is_from_admin", sa.Boolean()),
+        sa.Column("is_read", sa.Boolean()),
+        sa.Column("attachment_url", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_chat_message_id", "chat_message", ["id"])
+    op.create_index("ix_chat_message_user_id", "chat_message", ["user_id"])
+
+    op.create_table(
+        "vtutransaction",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("service_type", vtu_service_type, nullable=False),
+        sa.Column("provider", sa.String(), nullable=False),
+        sa.Column("recipient", sa.String(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("reference", sa.String()),
+        sa.Column("api_response", sa.JSON()),
+        sa.Column("status", transaction_status),
+        sa.Column("notes", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_vtutransaction_id", "vtutransaction", ["id"])
+    op.create_index("ix_vtutransaction_user_id", "vtutransaction", ["user_id"])
+
+
+def downgrade() -> None:
+    for table in [
+        "vtutransaction", "chat_message", "withdrawal", "giftcardtransaction",
+        "giftcard", "cryptotransaction", "crypto", "users",
+    ]:
+        op.drop_table(table)
+
+    bind = op.get_bind()
+    for enum_type in reversed(ENUMS):
+        enum_type.drop(bind, checkfirst=True)
@@ -0,0 +1,102 @@
+"""Hot-path composite and partial indexes
+
+Replaces the single-column user_id indexes with (user_id, created_at DESC,
+id DESC) composites that serve keyset-paginated history pages, adds
+partial indexes for the admin pending queues and active catalog rows, and
+drops the redundant indexes on UUID primary keys (the primary key
+constraint already has one).
+
+Indexes are built CONCURRENTLY so the migration does not block writes.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+TRANSACTION_TABLES = ["cryptotransaction", "giftcardtransaction", "withdrawal", "vtutransaction"]
+PENDING_QUEUE_TABLES = ["cryptotransaction", "giftcardtransaction", "withdrawal"]
+PRIMARY_KEY_INDEXES = {
+    "users": "ix_users_id",
+    "crypto": "ix_crypto_id",
+    "cryptotransaction": "ix_cryptotransaction_id",
+    "giftcard": "ix_giftcard_id",
+    "giftcardtransaction": "ix_giftcardtransaction_id",
+    "withdrawal": "ix_withdrawal_id",
+    "chat_message": "ix_chat_message_id",
+    "vtutransaction": "ix_vtutransaction_id",
+}
+
+NEWEST_FIRST = [sa.text("created_at DESC"), sa.text("id DESC")]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TRANSACTION_TABLES:
+            op.create_index(
+                f"ix_{table}_user_id_created_at", table, ["user_id", *NEWEST_FIRST],
+                postgresql_concurrently=True,
+            )
+        for table in PENDING_QUEUE_TABLES:
+            op.create_index(
+                f"ix_{table}_created_at", table, NEWEST_FIRST,
+                postgresql_concurrently=True,
+            )
+            # Enum columns store member names, so the pending value is 'PENDING'
+            op.create_index(
+                f"ix_{table}_pending", table, NEWEST_FIRST,
+                postgresql_where=sa.text("status = 'PENDING'"),
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            "ix_chat_message_user_id_created_at", "chat_message", ["user_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_crypto_active_symbol", "crypto", ["symbol"],
+            postgresql_where=sa.text("is_active = true"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_giftcard_active_type", "giftcard", ["type"],
+            postgresql_where=sa.text("is_active = true"),
+            postgresql_concurrently=True,
+        )
+
+        # Superseded by the composites above
+        for table in TRANSACTION_TABLES + ["chat_message"]:
+            op.drop_index(f"ix_{table}_user_id", table_name=table, postgresql_concurrently=True)
+        for table, index_name in PRIMARY_KEY_INDEXES.items():
+            op.drop_index(index_name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, index_name in PRIMARY_KEY_INDEXES.items():
+            op.create_index(index_name, table, ["id"], postgresql_concurrently=True)
+        for table in TRANSACTION_TABLES + ["chat_message"]:
+            op.create_index(f"ix_{table}_user_id", table, ["user_id"], postgresql_concurrently=True)
+
+        op.drop_index("ix_giftcard_active_type", table_name="giftcard", postgresql_concurrently=True)
+        op.drop_index("ix_crypto_active_symbol", table_name="crypto", postgresql_concurrently=True)
+        op.drop_index(
+            "ix_chat_message_user_id_created_at", table_name="chat_message",
+            postgresql_concurrently=True,
+        )
+        for table in PENDING_QUEUE_TABLES:
+            op.drop_index(f"ix_{table}_pending", table_name=table, postgresql_concurrently=True)
+            op.drop_index(f"ix_{table}_created_at", table_name=table, postgresql_concurrently=True)
+        for table in TRANSACTION_TABLES:
+            op.drop_index(
+                f"ix_{table}_user_id_created_at", table_name=table, postgresql_concurrently=True
+            )
@@ -0,0 +1,62 @@
+"""Chat conversation summary table for the admin inbox
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_conversation",
+        sa.Column(
+            "user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), primary_key=True
+        ),
+        sa.Column("unread_from_user", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("unread_from_admin", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_message_at", sa.DateTime(), nullable=False),
+        sa.Column("last_message_preview", sa.String(200)),
+    )
+    op.create_index(
+        "ix_chat_conversation_last_message_at", "chat_conversation",
+        [sa.text("last_message_at DESC"), sa.text("user_id DESC")],
+    )
+
+    # Backfill from existing messages
+    op.execute(
+        """
+        INSERT INTO chat_conversation (
+            user_id, unread_from_user, unread_from_admin, last_message_at, last_message_preview
+        )
+        SELECT
+            m.user_id,
+            COUNT(*) FILTER (WHERE NOT COALESCE(m.is_from_admin, false) AND NOT COALESCE(m.is_read, false)),
+            COUNT(*) FILTER (WHERE COALESCE(m.is_from_admin, false) AND NOT COALESCE(m.is_read, false)),
+            MAX(m.created_at),
+            (
+                SELECT LEFT(latest.message, 200) FROM chat_message latest
+                WHERE latest.user_id = m.user_id
+                ORDER BY latest.created_at DESC, latest.id DESC
+                LIMIT 1
+            )
+        FROM chat_message m
+        WHERE m.created_at IS NOT NULL
+        GROUP BY m.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_conversation_last_message_at", table_name="chat_conversation")
+    op.drop_table("chat_conversation")
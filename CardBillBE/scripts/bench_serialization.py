@@ -0,0 +1,120 @@
+"""
+Serialization microbenchmark: list responses before and after the pydantic v2 / orjson move
+
+For a page of `--rows` transactions, times
+- from_orm: the old path, Schema.from_orm() on each ORM entity with the
+  full detail schema, then jsonable_encoder and stdlib json (JSONResponse)
+- response_model: what FastAPI now does for a list route, validating
+  projected rows into List[ListItem], dumping in JSON mode, then
+  jsonable_encoder and orjson (ORJSONResponse)
+- dump_json: the ?fields= path, one TypeAdapter validating and dumping
+  straight to JSON bytes in pydantic-core
+
+Projected rows are stood in for by namedtuples, which expose columns as
+attributes the way SQLAlchemy Row does; no database is needed.
+
+    python -m scripts.bench_serialization --rows 100 --repeat 5
+"""
+import argparse
+import random
+import timeit
+import uuid
+import warnings
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def crypto_values(user_id: uuid.UUID, now: datetime) -> Dict[str, Any]:
+    from app.models.crypto import CryptoType, TransactionStatus, TransactionType
+
+    return dict(
+        id=uuid.uuid4(), user_id=user_id, crypto_type=random.choice(list(CryptoType)),
+        transaction_type=random.choice(list(TransactionType)), amount=0.25,
+        price=65000.0, total=16250.0, status=random.choice(list(TransactionStatus)),
+        wallet_address="bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh",
+        transaction_hash=None, admin_id=None,
+        created_at=now - timedelta(minutes=random.randrange(100000)), updated_at=now,
+    )
+
+
+def gift_card_values(user_id: uuid.UUID, now: datetime) -> Dict[str, Any]:
+    from app.models.crypto import TransactionStatus, TransactionType
+
+    return dict(
+        id=uuid.uuid4(), user_id=user_id, gift_card_id=uuid.uuid4(),
+        transaction_type=random.choice(list(TransactionType)), amount=100.0,
+        price=75000.0, total=75000.0, card_code="XXXX-XXXX-XXXX", card_pin="1234",
+        card_image_url="/uploads/card.jpg", status=random.choice(list(TransactionStatus)),
+        admin_id=None, notes="", created_at=now - timedelta(minutes=random.randrange(100000)),
+        updated_at=now,
+    )
+
+
+def cases() -> List[Tuple[str, Any, Any, Any, Callable]]:
+    from app.models.crypto import CryptoTransaction as CryptoModel
+    from app.models.gift_card import GiftCardTransaction as GiftCardModel
+    from app.schemas.crypto import CryptoTransaction, CryptoTransactionListItem
+    from app.schemas.gift_card import GiftCardTransaction, GiftCardTransactionListItem
+
+    return [
+        ("crypto", CryptoModel, CryptoTransaction, CryptoTransactionListItem, crypto_values),
+        ("gift card", GiftCardModel, GiftCardTransaction, GiftCardTransactionListItem, gift_card_values),
+    ]
+
+
+def paths(model, detail, list_item, make_values, rows: int) -> Dict[str, Callable[[], bytes]]:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from pydantic import TypeAdapter
+
+    from app.db.projection import columns_for
+
+    now = datetime.utcnow()
+    user_id = uuid.uuid4()
+    values = [make_values(user_id, now) for _ in range(rows)]
+    entities = [model(**v) for v in values]
+    names = [column.key for column in columns_for(model, list_item)]
+    Row = namedtuple("Row", names)
+    projected = [Row(**{name: v[name] for name in names}) for v in values]
+    adapter = TypeAdapter(List[list_item])
+
+    def from_orm() -> bytes:
+        return JSONResponse(content=jsonable_encoder([detail.from_orm(e) for e in entities])).body
+
+    def response_model() -> bytes:
+        items = adapter.validate_python(projected, from_attributes=True)
+        return ORJSONResponse(
+            content=jsonable_encoder(adapter.dump_python(items, mode="json", by_alias=True))
+        ).body
+
+    def dump_json() -> bytes:
+        return adapter.dump_json(adapter.validate_python(projected, from_attributes=True), by_alias=True)
+
+    return {"from_orm": from_orm, "response_model": response_model, "dump_json": dump_json}
+
+
+def main(args):
+    # from_orm is the deprecated v1 API being measured
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    print(f"{args.rows} rows per page, best of {args.repeat} x {args.number} calls")
+    print(f"{'schema':<10} {'path':<15} {'per page':>12} {'per row':>10} {'speedup':>8} {'bytes':>8}")
+    for name, model, detail, list_item, make_values in cases():
+        timings = paths(model, detail, list_item, make_values, args.rows)
+        baseline = None
+        for label, run in timings.items():
+            size = len(run())
+            best = min(timeit.repeat(run, number=args.number, repeat=args.repeat)) / args.number
+            baseline = baseline or best
+            print(
+                f"{name:<10} {label:<15} {best * 1e6:>9.1f} us {best * 1e6 / args.rows:>7.2f} us"
+                f" {baseline / best:>7.1f}x {size:>8}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200, help="calls per timing")
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,180 @@
+"""
+WebSocket delivery latency with many sockets on one worker
+
+Connects `--sockets` fake sockets (10k by default) spread over `--users`
+users to a WebSocketManager, then publishes `--broadcasts` broadcasts and
+`--direct` per-user sends. Each socket notes when its writer hands it a
+frame, giving publish-to-socket latency percentiles and, per broadcast,
+the time until the last socket has it.
+
+Messages go through an in-process LocalPubSub unless --redis-url is given,
+in which case they take the Redis pub/sub path of a multi-worker
+deployment. `--slow N` makes N of the sockets stop reading; with more
+than `--queue-size` + 1 broadcasts they should be evicted while every
+other socket still gets every frame.
+
+    python -m scripts.bench_ws_delivery --sockets 10000
+    python -m scripts.bench_ws_delivery --sockets 10000 --slow 100 --queue-size 8
+    python -m scripts.bench_ws_delivery --sockets 10000 --redis-url redis://localhost:6379/0
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+from scripts import env
+
+
+def percentiles(samples: List[float]) -> str:
+    if not samples:
+        return "n/a"
+    ordered = sorted(samples)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000
+    return f"p50 {pick(50):8.2f} ms  p99 {pick(99):8.2f} ms  max {ordered[-1] * 1000:8.2f} ms  (n={len(ordered)})"
+
+
+class Deliveries:
+    """
+    Publish time of each payload, and when each socket received it
+    """
+    def __init__(self):
+        self.published: Dict[str, float] = {}
+        self.latencies: List[float] = []
+        self.last_arrival: Dict[str, float] = {}
+        self.received = 0
+        self.changed = asyncio.Event()
+
+    def arrived(self, text: str):
+        now = time.perf_counter()
+        published = self.published.get(text)
+        if published is None:  # heartbeat or other traffic
+            return
+        self.latencies.append(now - published)
+        self.last_arrival[text] = now
+        self.received += 1
+        self.changed.set()
+
+    async def wait_for(self, total: int, timeout: float) -> bool:
+        deadline = time.perf_counter() + timeout
+        while self.received < total:
+            self.changed.clear()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self.changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+
+class FakeSocket:
+    """
+    Enough of starlette's WebSocket for Connection: send_text and close
+    """
+    def __init__(self, deliveries: Deliveries):
+        self.deliveries = deliveries
+        self.close_code = None
+
+    async def send_text(self, text: str):
+        self.deliveries.arrived(text)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+class StuckSocket(FakeSocket):
+    """
+    A client that stopped reading: its first send never completes
+    """
+    async def send_text(self, text: str):
+        await asyncio.Event().wait()
+
+
+async def main(args) -> int:
+    from app.utils.pubsub import LocalPubSub, get_pubsub
+    from app.utils.websocket_manager import WebSocketManager
+
+    pubsub = get_pubsub() if args.redis_url else LocalPubSub()
+    manager = WebSocketManager(pubsub=pubsub, queue_size=args.queue_size)
+    deliveries = Deliveries()
+    user_ids = [f"bench-{i}" for i in range(args.users)]
+    sockets = []
+
+    started = time.perf_counter()
+    for i in range(args.sockets):
+        socket = StuckSocket(deliveries) if i < args.slow else FakeSocket(deliveries)
+        await manager.add_connection(user_ids[i % args.users], socket)
+        sockets.append(socket)
+    print(f"connected {args.sockets} sockets for {args.users} users in {time.perf_counter() - started:.2f}s")
+    if args.redis_url:
+        # Let the subscriptions settle before publishing
+        await asyncio.sleep(1)
+
+    expected = 0
+    broadcast_texts = []
+    started = time.perf_counter()
+    for seq in range(args.broadcasts):
+        message = {"type": "bench", "seq": seq}
+        text = json.dumps(message)
+        broadcast_texts.append(text)
+        deliveries.published[text] = time.perf_counter()
+        await manager.broadcast(message)
+        expected += args.sockets - args.slow
+        await asyncio.sleep(args.interval)
+    for seq in range(args.direct):
+        user_id = random.choice(user_ids)
+        message = {"type": "bench-direct", "seq": seq, "to": user_id}
+        text = json.dumps(message)
+        deliveries.published[text] = time.perf_counter()
+        await manager.send_to_user(user_id, message)
+        expected += sum(
+            not isinstance(c.websocket, StuckSocket)
+            for c in manager.active_connections.get(user_id, ())
+        )
+    complete = await deliveries.wait_for(expected, args.timeout)
+    elapsed = time.perf_counter() - started
+
+    fanout = [
+        deliveries.last_arrival[text] - deliveries.published[text]
+        for text in broadcast_texts if text in deliveries.last_arrival
+    ]
+    print(f"{deliveries.received}/{expected} frames delivered in {elapsed:.2f}s "
+          f"({deliveries.received / elapsed:,.0f} frames/s) via {type(pubsub).__name__}")
+    print(f"publish -> socket:        {percentiles(deliveries.latencies)}")
+    print(f"broadcast -> all sockets: {percentiles(fanout)}")
+    print(f"manager: {manager.stats()}")
+    if args.slow:
+        evicted = sum(socket.close_code == 1013 for socket in sockets[:args.slow])
+        print(f"slow sockets evicted: {evicted}/{args.slow}")
+
+    for user_id, connections in list(manager.active_connections.items()):
+        for connection in list(connections):
+            await manager.remove_connection(user_id, connection.websocket)
+    await pubsub.stop()
+    if not complete:
+        print(f"FAIL: timed out after {args.timeout}s with frames undelivered")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sockets", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--broadcasts", type=int, default=20)
+    parser.add_argument("--direct", type=int, default=1000)
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between broadcasts")
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--slow", type=int, default=0, help="sockets that never drain their queue")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--redis-url", help="deliver through Redis pub/sub instead of in-process")
+    args = parser.parse_args()
+    if args.redis_url:
+        os.environ["REDIS_URL"] = args.redis_url
+    env.configure()
+    sys.exit(asyncio.run(main(args)))
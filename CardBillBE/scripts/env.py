@@ -0,0 +1,18 @@
+import os
+
+# The app's settings require these at import time; the scripts only use what they set explicitly
+REQUIRED_SETTINGS = (
+    "POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB",
+    "MAIL_USERNAME", "MAIL_PASSWORD", "MAIL_FROM", "MAIL_SERVER",
+    "VTU_API_KEY", "VTU_API_URL",
+)
+
+
+def configure(database_url: str = None):
+    """
+    Fill placeholder settings so app modules import outside a deployment
+    """
+    if database_url:
+        os.environ.setdefault("SQLALCHEMY_DATABASE_URI", database_url)
+    for name in REQUIRED_SETTINGS:
+        os.environ.setdefault(name, "bench")
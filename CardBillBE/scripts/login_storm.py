@@ -0,0 +1,126 @@
+"""
+Login storm against a running server: bcrypt back-pressure and event-loop latency
+
+Fires `--concurrency` logins at once, in `--waves` rounds, while a probe
+requests the health check every `--probe-interval` seconds. bcrypt runs in
+its own thread pool, so the probe should stay fast however many logins are
+hashing, and once more than PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING
+logins are in flight the extra ones should get an immediate 503 with
+Retry-After instead of queueing. Exits 1 if no 503 was seen or the probe's
+p99 exceeds `--max-probe-ms`.
+
+The account must exist; a wrong password still costs a full bcrypt check.
+Run one uvicorn worker so the cap applies to every request:
+
+    uvicorn main:app --workers 1 &
+    python -m scripts.login_storm --email someone@example.com --concurrency 400
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import List, Tuple
+
+import httpx
+
+
+def percentile(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def describe(samples: List[float]) -> str:
+    if not samples:
+        return "n/a"
+    return (
+        f"p50 {percentile(samples, 50):7.1f} ms  p99 {percentile(samples, 99):7.1f} ms  "
+        f"max {max(samples):7.1f} ms  (n={len(samples)})"
+    )
+
+
+async def login(client: httpx.AsyncClient, url: str, email: str, password: str) -> Tuple[int, float]:
+    started = time.perf_counter()
+    try:
+        response = await client.post(url, json={"email": email, "password": password})
+        code = response.status_code
+    except httpx.HTTPError:
+        code = 0
+    return code, (time.perf_counter() - started) * 1000
+
+
+async def probe(client: httpx.AsyncClient, url: str, interval: float, samples: List[float], done: asyncio.Event):
+    while not done.is_set():
+        started = time.perf_counter()
+        await client.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def main(args) -> int:
+    base = args.base_url.rstrip("/")
+    limits = httpx.Limits(max_connections=args.concurrency + 10, max_keepalive_connections=args.concurrency + 10)
+    timeout = httpx.Timeout(args.timeout)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client, \
+            httpx.AsyncClient(timeout=timeout) as probe_client:
+        # Idle baseline, on its own connection so it never waits behind a login
+        baseline: List[float] = []
+        idle = asyncio.Event()
+        idle_task = asyncio.create_task(probe(probe_client, base + "/", args.probe_interval, baseline, idle))
+        await asyncio.sleep(1)
+        idle.set()
+        await idle_task
+
+        under_load: List[float] = []
+        done = asyncio.Event()
+        probe_task = asyncio.create_task(probe(probe_client, base + "/", args.probe_interval, under_load, done))
+        codes: Counter = Counter()
+        latencies = {}
+        url = base + args.login_path
+        started = time.perf_counter()
+        for _ in range(args.waves):
+            results = await asyncio.gather(*(
+                login(client, url, args.email, args.password) for _ in range(args.concurrency)
+            ))
+            for code, elapsed in results:
+                codes[code] += 1
+                latencies.setdefault(code, []).append(elapsed)
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    total = sum(codes.values())
+    print(f"{total} logins in {elapsed:.1f}s ({total / elapsed:.0f}/s), {args.concurrency} concurrent x {args.waves}")
+    for code in sorted(codes):
+        label = {0: "error", 200: "ok", 401: "rejected", 503: "shed"}.get(code, "")
+        print(f"  {code:>3} {label:<8} {codes[code]:>6}  {describe(latencies[code])}")
+    print(f"health probe idle:       {describe(baseline)}")
+    print(f"health probe under load: {describe(under_load)}")
+    if under_load:
+        print(f"  mean {statistics.mean(under_load):.1f} ms")
+
+    failed = False
+    if not codes[503]:
+        print("FAIL: no 503 responses; raise --concurrency above PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING")
+        failed = True
+    if percentile(under_load, 99) > args.max_probe_ms:
+        print(f"FAIL: health probe p99 above {args.max_probe_ms} ms; the event loop is being blocked")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--login-path", default="/api/v1/auth/login")
+    parser.add_argument("--email", required=True, help="an existing account")
+    parser.add_argument("--password", default="wrong-password")
+    parser.add_argument("--concurrency", type=int, default=400)
+    parser.add_argument("--waves", type=int, default=3)
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--max-probe-ms", type=float, default=100.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    sys.exit(asyncio.run(main(parser.parse_args())))
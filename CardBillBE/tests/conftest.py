@@ -0,0 +1,47 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable
+
+import pytest
+
+# The app's settings require these at import time; tests only need the database
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ.setdefault("SQLALCHEMY_DATABASE_URI", TEST_DATABASE_URL)
+for name in (
+    "POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB",
+    "MAIL_USERNAME", "MAIL_PASSWORD", "MAIL_FROM", "MAIL_SERVER",
+    "VTU_API_KEY", "VTU_API_URL",
+):
+    os.environ.setdefault(name, "test")
+
+requires_postgres = pytest.mark.skipif(
+    not TEST_DATABASE_URL,
+    reason="set TEST_DATABASE_URL to a disposable postgresql+asyncpg database",
+)
+
+
+def run_with_db(scenario: Callable[[Any], Awaitable[Any]], pool_size: int = 20) -> Any:
+    """
+    Run scenario(sessionmaker) on a fresh event loop against TEST_DATABASE_URL
+
+    The engine is created inside the loop (asyncpg connections are bound to
+    it) with the schema in place, and disposed afterwards.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.base import Base
+
+    async def main():
+        engine = create_async_engine(
+            TEST_DATABASE_URL, pool_size=pool_size, max_overflow=0, pool_timeout=60
+        )
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            return await scenario(sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+
+class UnreachableRedis:
+    async def xrevrange(self, *args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+    async def xread(self, *args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+
+def test_start_survives_unreachable_redis(monkeypatch):
+    pytest.importorskip("fastapi")
+    from app.utils import admin_feed as admin_feed_module
+
+    monkeypatch.setattr(admin_feed_module, "get_redis", lambda: UnreachableRedis())
+    feed = admin_feed_module.AdminFeed(batch_interval=0.01, buffer_size=100)
+
+    async def scenario():
+        await feed.start()
+        try:
+            assert feed.stats()["following"]
+            assert feed.stats()["cursor"] is None
+            # A reconnecting dashboard is told to reload rather than trusting a replay
+            async with feed._lock:
+                assert await feed.replay("1-0") == {"type": "reset", "cursor": None}
+        finally:
+            await feed.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,113 @@
+import asyncio
+import uuid
+
+from tests.conftest import requires_postgres, run_with_db
+
+
+async def _create_user(Session, balance: float):
+    from app.models.user import User
+
+    async with Session() as db:
+        user = User(
+            email=f"{uuid.uuid4().hex}@example.com",
+            username=uuid.uuid4().hex,
+            password="x",
+            balance=balance,
+        )
+        db.add(user)
+        await db.commit()
+        return user.id
+
+
+async def _balance(Session, user_id) -> float:
+    from sqlalchemy import select
+
+    from app.models.user import User
+
+    async with Session() as db:
+        return (await db.execute(select(User.balance).where(User.id == user_id))).scalar_one()
+
+
+@requires_postgres
+def test_parallel_debits_never_overdraw():
+    from app.crud.crud_user import user as crud_user
+
+    async def scenario(Session):
+        user_id = await _create_user(Session, balance=1000.0)
+
+        async def debit():
+            async with Session() as db:
+                balance = await crud_user.debit_balance(db, user_id=user_id, amount=10.0)
+                await db.commit()
+                return balance
+
+        results = await asyncio.gather(*(debit() for _ in range(300)))
+        return results, await _balance(Session, user_id)
+
+    results, final = run_with_db(scenario)
+    succeeded = [b for b in results if b is not None]
+    assert len(succeeded) == 100
+    assert min(succeeded) == 0.0
+    assert final == 0.0
+
+
+@requires_postgres
+def test_racing_withdrawal_rejections_refund_once():
+    from app.crud.crud_withdrawal import withdrawal as crud_withdrawal
+    from app.models.withdrawal import Withdrawal, WithdrawalMethod, WithdrawalStatus
+    from app.schemas.withdrawal import WithdrawalUpdate
+
+    async def scenario(Session):
+        # Balance as left after a 100 withdrawal was debited from 1000
+        user_id = await _create_user(Session, balance=900.0)
+        async with Session() as db:
+            withdrawal = Withdrawal(
+                user_id=user_id, amount=100.0, fee=2.0, total=98.0,
+                method=WithdrawalMethod.BANK, account_details="0123456789",
+                status=WithdrawalStatus.PENDING,
+            )
+            db.add(withdrawal)
+            await db.commit()
+            withdrawal_id = withdrawal.id
+
+        async def reject():
+            async with Session() as db:
+                db_obj = await crud_withdrawal.get(db, id=withdrawal_id)
+                await crud_withdrawal.update(
+                    db, db_obj=db_obj, obj_in=WithdrawalUpdate(status=WithdrawalStatus.REJECTED)
+                )
+                await db.commit()
+
+        await asyncio.gather(*(reject() for _ in range(2)))
+        return await _balance(Session, user_id)
+
+    assert run_with_db(scenario) == 1000.0
+
+
+@requires_postgres
+def test_racing_vtu_failures_refund_once():
+    from app.crud.crud_vtu import vtu_transaction as crud_vtu
+    from app.models.crypto import TransactionStatus
+    from app.models.vtu import VTUServiceType, VTUTransaction
+
+    async def scenario(Session):
+        user_id = await _create_user(Session, balance=950.0)
+        async with Session() as db:
+            transaction = VTUTransaction(
+                user_id=user_id, service_type=VTUServiceType.AIRTIME, provider="MTN",
+                recipient="08012345678", amount=50.0, status=TransactionStatus.PENDING,
+            )
+            db.add(transaction)
+            await db.commit()
+            transaction_id = transaction.id
+
+        async def fail():
+            async with Session() as db:
+                db_obj = await crud_vtu.get(db, id=transaction_id)
+                await crud_vtu.update(db, db_obj=db_obj, obj_in={"status": TransactionStatus.FAILED})
+                await db.commit()
+
+        await asyncio.gather(*(fail() for _ in range(2)))
+        return await _balance(Session, user_id)
+
+    assert run_with_db(scenario) == 1000.0
@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+
+def test_local_last_seen_expires_after_ttl(monkeypatch):
+    pytest.importorskip("pydantic_settings")
+    from app.utils import presence as presence_module
+
+    monkeypatch.setattr(presence_module, "get_redis", lambda: None)
+    presence = presence_module.Presence(ttl=90, heartbeat=30, last_seen_ttl=60)
+    clock = [1000.0]
+    monkeypatch.setattr(presence_module.time, "time", lambda: clock[0])
+
+    async def scenario():
+        for user_id in ("a", "b", "c"):
+            await presence.connected(user_id)
+            await presence.disconnected(user_id)
+            clock[0] += 30
+        # "a" left 90s ago and "b" 60s ago; "c" is still within the ttl
+        return await presence.last_seen(["a", "b", "c"])
+
+    assert asyncio.run(scenario()) == {"b": 1030.0, "c": 1060.0}
+    clock[0] += 30
+    assert asyncio.run(presence.last_seen(["a", "b", "c"])) == {"c": 1060.0}
+    assert list(presence._last_seen) == ["c"]
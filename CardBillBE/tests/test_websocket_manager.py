@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import pytest
+
+QUEUE_SIZE = 4
+MESSAGES = 20
+
+
+class DrainingSocket:
+    def __init__(self):
+        self.received = []
+        self.close_code = None
+
+    async def send_text(self, text: str):
+        self.received.append(json.loads(text))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+class StuckSocket(DrainingSocket):
+    """
+    A client that stopped reading: its first send never completes
+    """
+    async def send_text(self, text: str):
+        await asyncio.Event().wait()
+
+
+def test_slow_consumer_is_evicted_while_others_keep_receiving():
+    pytest.importorskip("fastapi")
+    from app.utils.pubsub import LocalPubSub
+    from app.utils.websocket_manager import USER_CHANNEL_PREFIX, WebSocketManager
+
+    async def scenario():
+        pubsub = LocalPubSub()
+        manager = WebSocketManager(pubsub=pubsub, queue_size=QUEUE_SIZE)
+        # Two devices for one user, one for another, and a client that never drains
+        healthy = {
+            ("alice", DrainingSocket()), ("alice", DrainingSocket()), ("bob", DrainingSocket()),
+        }
+        stuck = StuckSocket()
+        for user_id, socket in healthy:
+            await manager.add_connection(user_id, socket)
+        await manager.add_connection("stuck", stuck)
+
+        for seq in range(MESSAGES):
+            await manager.broadcast({"type": "tick", "seq": seq})
+            await manager.send_to_user("alice", {"type": "direct", "seq": seq})
+            # Let the writers drain, as a live event loop would between publishes
+            await asyncio.sleep(0.001)
+        await asyncio.gather(*manager._evictions)
+
+        try:
+            assert stuck.close_code == 1013
+            assert manager.evicted == 1
+            assert "stuck" not in manager.active_connections
+            assert USER_CHANNEL_PREFIX + "stuck" not in pubsub._handlers
+            for user_id, socket in healthy:
+                ticks = [m["seq"] for m in socket.received if m["type"] == "tick"]
+                directs = [m["seq"] for m in socket.received if m["type"] == "direct"]
+                assert ticks == list(range(MESSAGES))
+                assert directs == (list(range(MESSAGES)) if user_id == "alice" else [])
+                assert socket.close_code is None
+        finally:
+            for user_id, socket in healthy:
+                await manager.remove_connection(user_id, socket)
+
+    asyncio.run(scenario())